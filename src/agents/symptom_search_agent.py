@@ -4,6 +4,7 @@ Uses embedding model (port 8081) for retrieval + Gemini LLM with medical-only fa
 """
 import sys
 import os
+import re
 from typing import Dict, List, Any
 
 # Add project root to path
@@ -19,6 +20,9 @@ except:
     HAS_RAG = False
     print("Warning: RAG retriever not available")
 
+# JSON inside a ```json ... ``` (or bare ```) markdown block
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
 
 class SymptomSearchAgent:
     """RAG-based symptom search with embedding model + LLM fallback"""
@@ -122,9 +126,10 @@ class SymptomSearchAgent:
         # Build context section from RAG chunks
         context_section = ""
         if rag_context:
-            context_section = "\n\nMEDICAL SOURCES:\n"
+            parts = ["\n\nMEDICAL SOURCES:\n"]
             for i, chunk in enumerate(rag_context[:2], 1):  # Only 2 chunks to reduce length
-                context_section += f"[{i}] {chunk['text'][:250]}...\n"
+                parts.append(f"[{i}] {chunk['text'][:250]}...\n")
+            context_section = ''.join(parts)
         
         prompt = f"""Medical AI: Analyze symptoms, return ONLY valid JSON (no markdown).
 
@@ -168,7 +173,6 @@ RETURN ONLY JSON:"""
         This is the core agentic pipeline step
         """
         import json
-        import re
         
         recommendations = []
         
@@ -179,8 +183,7 @@ RETURN ONLY JSON:"""
             # Remove markdown code blocks (```json ... ``` or ``` ... ```)
             if '```' in cleaned_response:
                 # Extract content between code blocks
-                code_block_pattern = r'```(?:json)?\s*(.*?)\s*```'
-                matches = re.findall(code_block_pattern, cleaned_response, re.DOTALL)
+                matches = _CODE_BLOCK_RE.findall(cleaned_response)
                 if matches:
                     cleaned_response = matches[0]  # Use first code block
                 else:
@@ -14,9 +14,18 @@ Date: 2025-12-06
 
 import sys
 from pathlib import Path
-from difflib import get_close_matches
+from difflib import get_close_matches, SequenceMatcher
+from bisect import bisect_left
+from functools import lru_cache
 import re
 
+# RapidFuzz scores names in C++; fall back to difflib when it isn't installed
+try:
+    from rapidfuzz import fuzz, process
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
 # Add src/core to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -28,12 +37,69 @@ from utils import (
     starts_with_ignore_case,
     sort_by_price
 )
+from symspell_index import HAS_SYMSPELL, build_symspell, lookup_words, name_key
 from typing import List, Dict, Optional, Tuple
 
 # ============================================================
 # AUTOCOMPLETE
 # ============================================================
 
+# Sorted lowercased medicine names, rebuilt only when the catalog is reloaded
+_NAME_INDEX = None
+
+# SymSpell deletion index over name words, rebuilt with the name index
+_SYMSPELL = None
+
+
+def _get_name_index(medicines: List[Dict]) -> Tuple[List[str], List[str]]:
+    """
+    Distinct medicine names sorted by their lowercased form
+
+    Names sharing a prefix are contiguous, so a prefix lookup is two
+    bisections instead of a scan over the catalog. Two flat lists rather
+    than a trie: no per-node objects, and the lowercased list is also the
+    one scanned by the contains tier and fuzzy scoring.
+
+    Returns:
+        (lowered_names, names) as parallel lists
+    """
+    global _NAME_INDEX, _SYMSPELL
+
+    if _NAME_INDEX is None or _NAME_INDEX[0] is not medicines:
+        unique_names = {med.get('name', '') for med in medicines} - {''}
+        pairs = sorted((name.lower(), name) for name in unique_names)
+        _NAME_INDEX = (medicines, [lower for lower, _ in pairs], [name for _, name in pairs])
+        _SYMSPELL = None
+        # Memoized fuzzy results belong to the previous catalog
+        clear_search_caches()
+
+    return _NAME_INDEX[1], _NAME_INDEX[2]
+
+
+def _get_symspell(medicines: List[Dict]):
+    """SymSpell index for the current catalog, or None without symspellpy"""
+    global _SYMSPELL
+
+    _get_name_index(medicines)
+    if _SYMSPELL is None and HAS_SYMSPELL:
+        _SYMSPELL = build_symspell(medicines)
+    return _SYMSPELL
+
+
+def _names_for_word(medicines: List[Dict], word: str) -> List[str]:
+    """Medicine names whose first word is `word`, from the sorted name index"""
+    lowered_names, names = _get_name_index(medicines)
+    start = bisect_left(lowered_names, word)
+    end = bisect_left(lowered_names, word + '\U0010ffff', start)
+    return [names[i] for i in range(start, end) if name_key(lowered_names[i]) == word]
+
+
+def clear_search_caches():
+    """Clear memoized fuzzy search and correction results"""
+    _fuzzy_matches.cache_clear()
+    _suggest_correction.cache_clear()
+
+
 def autocomplete_medicine(partial_name: str,
                          max_suggestions: int = 10,
                          search_fields: List[str] = None) -> List[str]:
@@ -68,6 +134,9 @@ def autocomplete_medicine(partial_name: str,
     if search_fields is None:
         search_fields = ['name']
 
+    if search_fields == ['name']:
+        return _autocomplete_name(medicines, search_term, max_suggestions)
+
     suggestions = []
     seen = set()  # Avoid duplicates
 
@@ -117,6 +186,32 @@ def autocomplete_medicine(partial_name: str,
     return suggestions
 
 
+def _autocomplete_name(medicines: List[Dict], search_term: str, max_suggestions: int) -> List[str]:
+    """autocomplete_medicine over names only, using the sorted name index"""
+    lowered_names, names = _get_name_index(medicines)
+
+    # 1. Exact prefix matches are one contiguous slice of the index
+    start = bisect_left(lowered_names, search_term)
+    end = bisect_left(lowered_names, search_term + '\U0010ffff', start)
+    prefix_matches = sorted(names[start:end])
+    if len(prefix_matches) >= max_suggestions:
+        return prefix_matches[:max_suggestions]
+
+    # Too few prefix matches: rank the rest as word-prefix or contains matches
+    scored_suggestions = []
+    for i, value_lower in enumerate(lowered_names):
+        if start <= i < end or search_term not in value_lower:
+            continue
+        if any(word.startswith(search_term) for word in value_lower.split()):
+            scored_suggestions.append((names[i], 2))
+        else:
+            scored_suggestions.append((names[i], 1))
+    scored_suggestions.sort(key=lambda x: (-x[1], x[0]))
+
+    others = [name for name, score in scored_suggestions[:max_suggestions - len(prefix_matches)]]
+    return prefix_matches + others
+
+
 def autocomplete_brand(partial_brand: str, max_suggestions: int = 10) -> List[str]:
     """
     Get brand name suggestions
@@ -218,7 +313,47 @@ def fuzzy_search_medicine(query: str,
     if not query:
         return []
 
+    # Validates the memoized results against the current catalog
+    _get_name_index(load_medicines())
+    return list(_fuzzy_matches(query, max_results, cutoff))
+
+
+def _name_similarity(query_lower: str, name_lower: str) -> float:
+    """Similarity (0.0-1.0) of a query and a name, scored like the fuzzy scan"""
+    if HAS_RAPIDFUZZ:
+        return fuzz.ratio(query_lower, name_lower) / 100
+    return SequenceMatcher(None, query_lower, name_lower).ratio()
+
+
+@lru_cache(maxsize=512)
+def _fuzzy_matches(query: str, max_results: int, cutoff: float) -> Tuple[Tuple[str, float], ...]:
+    """fuzzy_search_medicine results, memoized since the same typos recur"""
     medicines = load_medicines()
+    query_lower = query.lower()
+
+    sym_spell = _get_symspell(medicines)
+    if sym_spell is not None and len(query_lower.split()) == 1:
+        # Single word: names whose first word is within 2 edits (from the
+        # deletion index) get that word's score; whole-name similarity only
+        # orders names sharing a word, since a bare word such as "panodol"
+        # scores far below the cutoff against a full "Panadol Extra 500mg"
+        ranked = []
+        for word, score in lookup_words(sym_spell, query_lower, closest_only=False):
+            if score < cutoff:
+                continue
+            for name in _names_for_word(medicines, word):
+                ranked.append((-score, -_name_similarity(query_lower, name.lower()), name))
+        if ranked:
+            ranked.sort()
+            return tuple((name, -neg_score) for neg_score, _, name in ranked[:max_results])
+
+    if HAS_RAPIDFUZZ:
+        # Score the pre-lowercased names; extract keeps only the top matches
+        lowered_names, names = _get_name_index(medicines)
+        matches = process.extract(query_lower, lowered_names, scorer=fuzz.ratio,
+                                  limit=max_results, score_cutoff=cutoff * 100)
+        return tuple((names[i], score / 100) for _, score, i in matches)
+
     medicine_names = [med.get('name', '') for med in medicines if med.get('name')]
 
     # Get close matches using difflib
@@ -226,15 +361,13 @@ def fuzzy_search_medicine(query: str,
 
     # Calculate similarity scores
     # (get_close_matches uses SequenceMatcher internally)
-    from difflib import SequenceMatcher
-
     results = []
     for match in matches:
-        similarity = SequenceMatcher(None, query.lower(), match.lower()).ratio()
+        similarity = SequenceMatcher(None, query_lower, match.lower()).ratio()
         results.append((match, similarity))
 
     # Already sorted by similarity (descending)
-    return results
+    return tuple(results)
 
 
 def suggest_correction(query: str, confidence_threshold: float = 0.85) -> Optional[str]:
@@ -255,11 +388,36 @@ def suggest_correction(query: str, confidence_threshold: float = 0.85) -> Option
         >>> suggestion = suggest_correction("xyz123")
         >>> # Returns: None (no good match)
     """
+    # Validates the memoized results against the current catalog
+    _get_name_index(load_medicines())
+    return _suggest_correction(query, confidence_threshold)
+
+
+@lru_cache(maxsize=512)
+def _suggest_correction(query: str, confidence_threshold: float) -> Optional[str]:
+    """suggest_correction result, memoized since the same typos recur"""
     # First check if exact match exists
     medicines = load_medicines()
-    for med in medicines:
-        if med.get('name', '').lower() == query.lower():
-            return None  # Exact match found, no correction needed
+    lowered_names, _ = _get_name_index(medicines)
+    query_lower = query.lower()
+    i = bisect_left(lowered_names, query_lower)
+    if i < len(lowered_names) and lowered_names[i] == query_lower:
+        return None  # Exact match found, no correction needed
+
+    # Correct the leading word with the deletion index, then pick its closest name
+    sym_spell = _get_symspell(medicines)
+    words = query_lower.split()
+    if sym_spell is not None and words:
+        for word, score in lookup_words(sym_spell, words[0]):
+            if word == words[0]:
+                if len(words) == 1:
+                    return None  # A correctly spelled name word needs no correction
+                break  # Leading word is right; leave the rest to fuzzy search
+            # Confidence is in the corrected word; the name only has to start with it
+            candidates = _names_for_word(medicines, word)
+            if score < confidence_threshold or not candidates:
+                continue
+            return max(candidates, key=lambda name: _name_similarity(query_lower, name.lower()))
 
     # Try fuzzy search
     results = fuzzy_search_medicine(query, max_results=1, cutoff=confidence_threshold)
@@ -339,6 +497,38 @@ def search_with_autocorrect(query: str, max_results: int = 10) -> Dict:
 # MULTI-FIELD SEARCH
 # ============================================================
 
+# Lowercased field columns (struct of arrays), rebuilt only when the catalog is reloaded
+_FIELD_COLUMNS = None
+
+
+def _get_field_column(medicines: List[Dict], field: str) -> List[Tuple[int, str]]:
+    """
+    One field of every medicine as (position, lowercased value) pairs
+
+    List fields are joined with spaces and empty values are left out, so a
+    search scans one flat column per field instead of every medicine dict.
+    """
+    global _FIELD_COLUMNS
+
+    if _FIELD_COLUMNS is None or _FIELD_COLUMNS[0] is not medicines:
+        _FIELD_COLUMNS = (medicines, {})
+
+    columns = _FIELD_COLUMNS[1]
+    if field not in columns:
+        column = []
+        for i, medicine in enumerate(medicines):
+            value = medicine.get(field, '')
+            if not value:
+                continue
+            # Handle list fields
+            if isinstance(value, list):
+                value = ' '.join(value)
+            column.append((i, value.lower()))
+        columns[field] = column
+
+    return columns[field]
+
+
 def multi_field_search(query: str,
                       fields: List[str] = None,
                       max_results: int = 20) -> List[Dict]:
@@ -367,38 +557,28 @@ def multi_field_search(query: str,
     medicines = load_medicines()
     query_lower = query.lower().strip()
 
-    scored_results = []
-
-    for medicine in medicines:
-        score = 0
+    scores = {}  # Medicine position -> score
 
-        for field in fields:
-            value = medicine.get(field, '')
-            if not value:
+    for field in fields:
+        # Substring test first; only the hits need the finer match grading
+        for i, value_lower in _get_field_column(medicines, field):
+            if query_lower not in value_lower:
                 continue
 
-            # Handle list fields
-            if isinstance(value, list):
-                value = ' '.join(value)
-
-            value_lower = value.lower()
-
             # Score based on match quality
             if query_lower == value_lower:
-                score += 10  # Exact match
+                score = 10  # Exact match
             elif value_lower.startswith(query_lower):
-                score += 5  # Prefix match
-            elif query_lower in value_lower:
-                score += 1  # Contains match
-
-        if score > 0:
-            scored_results.append((medicine, score))
+                score = 5  # Prefix match
+            else:
+                score = 1  # Contains match
+            scores[i] = scores.get(i, 0) + score
 
-    # Sort by score (descending)
-    scored_results.sort(key=lambda x: x[1], reverse=True)
+    # Sort by score (descending), ties in catalog order
+    ranked = sorted(scores, key=lambda i: (-scores[i], i))
 
     # Extract medicines and limit
-    results = [med for med, score in scored_results[:max_results]]
+    results = [medicines[i] for i in ranked[:max_results]]
 
     return results
 
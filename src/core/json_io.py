@@ -0,0 +1,49 @@
+"""
+JSON Helpers for MedFinder
+
+orjson is much faster for the large medicines.json loads and dumps; every
+helper here falls back to stdlib json with the same output format when it
+is not installed.
+
+Author: MedFinder Team
+Date: 2025-12-06
+"""
+
+import json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads(data):
+    """Parse JSON from str or bytes"""
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+
+def dumps_indented(obj) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def dumps_line(obj) -> bytes:
+    """Serialize obj as one UTF-8 JSONL line"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj) + b'\n'
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def load_json(path):
+    """Load a JSON file"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_json(obj, path):
+    """Write obj to a file as indented UTF-8 JSON"""
+    with open(path, 'wb') as f:
+        f.write(dumps_indented(obj))
@@ -22,6 +22,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from utils import (
     load_medicines,
+    get_medicine_indexes,
     normalize_composition,
     parse_price,
     sort_by_price,
@@ -34,6 +35,31 @@ from typing import List, Dict, Optional, Tuple
 # CORE SIMILARITY FUNCTIONS
 # ============================================================
 
+# Medicines grouped by normalized composition, rebuilt only when the catalog is reloaded
+_COMPOSITION_INDEX = None
+
+
+def _get_composition_index() -> Dict[str, List[Dict]]:
+    """
+    Map each normalized composition to its medicines, cheapest first
+
+    Lets get_similar_medicines read one presorted group instead of
+    normalizing and comparing every composition in the catalog on each call.
+    """
+    global _COMPOSITION_INDEX
+
+    by_price = get_medicine_indexes()['by_price']
+    if _COMPOSITION_INDEX is None or _COMPOSITION_INDEX[0] is not by_price:
+        groups = {}
+        for medicine in by_price:
+            composition = normalize_composition(medicine.get('composition', ''))
+            if composition:
+                groups.setdefault(composition, []).append(medicine)
+        _COMPOSITION_INDEX = (by_price, groups)
+
+    return _COMPOSITION_INDEX[1]
+
+
 def find_medicine_by_name(medicine_name: str) -> Optional[Dict]:
     """
     Find a medicine by name (case-insensitive, partial match)
@@ -52,9 +78,9 @@ def find_medicine_by_name(medicine_name: str) -> Optional[Dict]:
     search_name = medicine_name.lower().strip()
 
     # Try exact match first
-    for medicine in medicines:
-        if medicine.get('name', '').lower() == search_name:
-            return medicine
+    medicine = get_medicine_indexes()['by_name_lower'].get(search_name)
+    if medicine is not None:
+        return medicine
 
     # Try partial match (contains)
     for medicine in medicines:
@@ -99,29 +125,21 @@ def get_similar_medicines(medicine_name: str,
     if not ref_composition:
         return []
 
-    # Find all medicines with the same composition
-    medicines = load_medicines()
+    # Find all medicines with the same composition (groups are already cheapest first)
     similar = []
 
-    for medicine in medicines:
-        composition = normalize_composition(medicine.get('composition', ''))
+    for medicine in _get_composition_index().get(ref_composition, []):
+        # Exclude the reference medicine itself
+        if medicine.get('name', '') == reference.get('name', ''):
+            continue
 
-        # Check exact composition match
-        if composition == ref_composition:
-            # Exclude the reference medicine itself
-            if medicine.get('name', '') == reference.get('name', ''):
+        # Exclude same brand if specified
+        if exclude_same_brand:
+            brand = medicine.get('brand', '').lower()
+            if brand == ref_brand:
                 continue
 
-            # Exclude same brand if specified
-            if exclude_same_brand:
-                brand = medicine.get('brand', '').lower()
-                if brand == ref_brand:
-                    continue
-
-            similar.append(medicine)
-
-    # Sort by price (cheapest first)
-    similar = sort_by_price(similar, ascending=True)
+        similar.append(medicine)
 
     # Limit results if specified
     if max_results:
@@ -157,22 +175,19 @@ def get_alternatives_with_savings(medicine_name: str,
     if ref_price is None:
         return []
 
-    # Get similar medicines
+    # Get similar medicines (cheapest first)
     similar = get_similar_medicines(medicine_name, exclude_same_brand=True)
 
-    # Calculate savings for each
+    # Savings only fall as price rises, so price order is already highest
+    # savings first and the cheapest max_results are the answer
     with_savings = []
     for medicine in similar:
         alt_price = parse_price(medicine.get('price', ''))
         if alt_price is not None:
             savings = calculate_savings(ref_price, alt_price)
             with_savings.append((medicine, savings))
-
-    # Sort by savings (highest first)
-    with_savings.sort(key=lambda x: x[1], reverse=True)
-
-    if max_results:
-        with_savings = with_savings[:max_results]
+            if max_results and len(with_savings) == max_results:
+                break
 
     return with_savings
 
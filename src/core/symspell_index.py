@@ -0,0 +1,87 @@
+"""
+SymSpell Index for MedFinder
+
+Precomputed deletion index over medicine name words, used by enhanced_search
+to correct misspelled names without scoring every name in the catalog:
+- Dictionary: first word of each distinct lowercased medicine name
+  (e.g. "panadol", "brufen"), counted by how many names start with it
+- Lookup: a typo within 2 edits maps to dictionary words in constant time
+
+The index is built in memory from the medicines list it is given (a few
+thousand distinct words), so it always matches the catalog being searched.
+
+Author: MedFinder Team
+Date: 2025-12-06
+"""
+
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+# symspellpy is optional; enhanced_search falls back to its fuzzy scan without it
+try:
+    from symspellpy import SymSpell, Verbosity
+    HAS_SYMSPELL = True
+except ImportError:
+    HAS_SYMSPELL = False
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def name_key(name: str) -> str:
+    """Dictionary word for a medicine name: its lowercased first word"""
+    words = name.lower().split()
+    return words[0] if words else ''
+
+
+def build_symspell(medicines: List[Dict]) -> Optional['SymSpell']:
+    """
+    Build the deletion index from medicine names
+
+    Args:
+        medicines: List of medicine dictionaries
+
+    Returns:
+        SymSpell instance with one entry per distinct name word,
+        or None if symspellpy is not installed
+    """
+    if not HAS_SYMSPELL:
+        return None
+
+    unique_names = {med.get('name', '').lower() for med in medicines} - {''}
+    counts = Counter(name_key(name) for name in unique_names)
+
+    sym_spell = SymSpell(max_dictionary_edit_distance=MAX_EDIT_DISTANCE,
+                         prefix_length=PREFIX_LENGTH)
+    for word, count in counts.items():
+        if word:
+            sym_spell.create_dictionary_entry(word, count)
+    return sym_spell
+
+
+def lookup_words(sym_spell: 'SymSpell', word: str,
+                 closest_only: bool = True) -> List[Tuple[str, float]]:
+    """
+    Dictionary words within MAX_EDIT_DISTANCE of a word
+
+    Args:
+        sym_spell: Index from build_symspell
+        word: Possibly misspelled word
+        closest_only: Only the smallest edit distance (Verbosity.CLOSEST)
+                      instead of every word in range (Verbosity.ALL)
+
+    Returns:
+        (dictionary word, similarity) pairs, closest and most frequent first.
+        Similarity is 1 - edit distance / length of the longer word, so
+        "panodol" -> "panadol" (1 edit in 7 letters) scores 0.86
+    """
+    word = word.lower()
+    verbosity = Verbosity.CLOSEST if closest_only else Verbosity.ALL
+    suggestions = sym_spell.lookup(word, verbosity,
+                                   max_edit_distance=MAX_EDIT_DISTANCE)
+    return [(item.term, 1 - item.distance / max(len(word), len(item.term)))
+            for item in suggestions]
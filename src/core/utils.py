@@ -27,6 +27,9 @@ MEDICINES_FILE = str(DATA_DIR / 'medicines.json')
 # Cache for loaded medicines data
 _MEDICINES_CACHE = None
 
+# Lookup indexes over the cached medicines, built on first use
+_MEDICINE_INDEXES = None
+
 # ============================================================
 # MEDICINE DATA LOADING
 # ============================================================
@@ -67,8 +70,35 @@ def load_medicines(use_cache=True) -> List[Dict]:
 
 def clear_cache():
     """Clear the medicines cache (useful for testing)"""
-    global _MEDICINES_CACHE
+    global _MEDICINES_CACHE, _MEDICINE_INDEXES
     _MEDICINES_CACHE = None
+    _MEDICINE_INDEXES = None
+
+
+def get_medicine_indexes() -> Dict:
+    """
+    Lookup structures over load_medicines(), built once per loaded catalog
+
+    Returns:
+        Dictionary with:
+        - by_name_lower: Dict[str, Dict] (first medicine for each lowercased name)
+        - by_price: List[Dict] (all medicines, cheapest first, unpriced last;
+          equal prices keep catalog order)
+    """
+    global _MEDICINE_INDEXES
+
+    medicines = load_medicines()
+    if _MEDICINE_INDEXES is None or _MEDICINE_INDEXES[0] is not medicines:
+        by_name_lower = {}
+        for medicine in medicines:
+            by_name_lower.setdefault(medicine.get('name', '').lower(), medicine)
+
+        _MEDICINE_INDEXES = (medicines, {
+            'by_name_lower': by_name_lower,
+            'by_price': sort_by_price(medicines)
+        })
+
+    return _MEDICINE_INDEXES[1]
 
 
 # ============================================================
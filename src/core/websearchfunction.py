@@ -9,12 +9,32 @@ Date: 2025-12-06
 """
 
 import json
+import sys
 import requests
+from requests.adapters import HTTPAdapter
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 import os
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Add src/core to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+# orjson-with-stdlib-fallback helpers for the cache file
+from json_io import loads, dumps_indented
+
+# diskcache gives a persistent, process-safe cache with per-entry expiry;
+# without it the cache is the JSON file
+try:
+    from diskcache import Cache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -24,9 +44,28 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / 'data'
 
 CACHE_FILE = str(DATA_DIR / 'availability_cache.json')
+DISK_CACHE_DIR = str(DATA_DIR / 'availability_cache')
+DISK_CACHE_SIZE_LIMIT = 256 * 1024 * 1024  # Bytes
 CACHE_DURATION_HOURS = 2
 MEDICINES_FILE = str(DATA_DIR / 'medicines.json')
 API_ENDPOINT = 'https://dawaai.pk/product/get_product'
+FIND_CACHE_SIZE = 1024  # Memoized queries per medicine index
+MAX_PARALLEL_CHECKS = 16  # Concurrent API calls in check_multiple_medicines_parallel
+
+# Shared keep-alive session, pooled for parallel batch checks
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=MAX_PARALLEL_CHECKS, pool_maxsize=MAX_PARALLEL_CHECKS)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# Product ID in a medicine URL: medicine/anything-NUMBER.html
+_PRODUCT_ID_RE = re.compile(r'-(\d+)\.html')
+
+# Serializes cache read-modify-write when checks run in threads
+_CACHE_LOCK = threading.Lock()
+
+# Opened on first use, so importing this module creates no cache files
+_DISK_CACHE = None
 
 # ============================================================
 # STEP 1: Load medicines.json
@@ -46,19 +85,62 @@ def load_medicines():
 # ============================================================
 # STEP 2: Find medicine by name
 # ============================================================
-def find_medicine(medicine_name, medicines):
+def build_medicine_index(medicines):
+    """
+    Build a lookup index for repeated find_medicine calls
+    
+    Args:
+        medicines: List of all medicines
+    
+    Returns:
+        (exact, lowered_names, find_position) where exact maps a lowercased
+        name to its first position, lowered_names is the lowercased name of
+        every medicine in order, and find_position is a memoized lookup from
+        a normalized query to a position (or None)
+    """
+    exact = {}
+    lowered_names = []
+    
+    for i, med in enumerate(medicines):
+        name_lower = med['name'].lower()
+        lowered_names.append(name_lower)
+        exact.setdefault(name_lower, i)
+    
+    # Repeated queries (e.g. the same name across tests) skip the search
+    @lru_cache(maxsize=FIND_CACHE_SIZE)
+    def find_position(search_name):
+        # First try exact match
+        if search_name in exact:
+            return exact[search_name]
+        
+        # Then partial match: first medicine whose name contains the query
+        for i, name_lower in enumerate(lowered_names):
+            if search_name in name_lower:
+                return i
+        
+        return None
+    
+    return exact, lowered_names, find_position
+
+def find_medicine(medicine_name, medicines, index=None):
     """
     Search for medicine by name (case-insensitive, partial match)
     
     Args:
         medicine_name: Name of the medicine to search for
         medicines: List of all medicines
+        index: Optional result of build_medicine_index(medicines)
     
     Returns:
         Medicine dict if found, None otherwise
     """
     search_name = medicine_name.lower().strip()
     
+    if index is not None:
+        find_position = index[2]
+        position = find_position(search_name)
+        return medicines[position] if position is not None else None
+    
     # First try exact match
     for med in medicines:
         if search_name == med['name'].lower():
@@ -91,8 +173,18 @@ def extract_product_id(url):
     if not url:
         return None
     
+    # Fast path for the usual shape: walk back over the digits before '.html'
+    # and check they follow a '-' (no regex, no intermediate strings)
+    end = len(url) - 5
+    if end > 0 and url.endswith('.html'):
+        i = end - 1
+        while i >= 0 and '0' <= url[i] <= '9':
+            i -= 1
+        if i >= 0 and url[i] == '-' and i + 1 < end:
+            return url[i + 1:end]
+    
     # Pattern: medicine/anything-NUMBER.html
-    match = re.search(r'-(\d+)\.html', url)
+    match = _PRODUCT_ID_RE.search(url)
     if match:
         return match.group(1)
     
@@ -116,7 +208,7 @@ def call_availability_api(p_id):
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-        response = requests.post(
+        response = SESSION.post(
             API_ENDPOINT,
             data={"p_id": p_id},
             timeout=10,
@@ -184,40 +276,90 @@ def parse_availability(api_response):
 def load_cache():
     """Load cache from file"""
     try:
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(CACHE_FILE, 'rb') as f:
+            data = f.read()
+        return loads(data)
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
 def save_cache(cache):
-    """Save cache to file"""
+    """Save cache to file (atomically, so readers never see a partial file)"""
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, indent=2, ensure_ascii=False)
+        # Give older entries an epoch timestamp so they are not reparsed
+        for item in cache.values():
+            if 'last_checked_epoch' not in item:
+                epoch = cached_epoch(item)
+                if epoch is not None:
+                    item['last_checked_epoch'] = epoch
+        
+        temp_file = CACHE_FILE + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(dumps_indented(cache))
+        os.replace(temp_file, CACHE_FILE)
     except Exception as e:
         print(f"⚠️  Could not save cache: {e}")
 
+def _get_disk_cache():
+    """diskcache store under DISK_CACHE_DIR, or None without diskcache"""
+    global _DISK_CACHE
+    if _DISK_CACHE is None and HAS_DISKCACHE:
+        with _CACHE_LOCK:
+            if _DISK_CACHE is None:
+                _DISK_CACHE = Cache(DISK_CACHE_DIR, size_limit=DISK_CACHE_SIZE_LIMIT)
+    return _DISK_CACHE
+
+def cache_get(cache_key):
+    """Cached item for a medicine name, or None"""
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        return disk_cache.get(cache_key)
+    return load_cache().get(cache_key)
+
+def cache_put(cache_key, cached_item):
+    """Store a cached item for a medicine name"""
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        # Entries past the freshness window are dropped by diskcache itself
+        disk_cache.set(cache_key, cached_item, expire=CACHE_DURATION_HOURS * 3600)
+        return
+    
+    with _CACHE_LOCK:
+        cache = load_cache()
+        cache[cache_key] = cached_item
+        save_cache(cache)
+
+def cached_epoch(cached_item):
+    """When a cached item was checked, in epoch seconds (None if unknown)"""
+    epoch = cached_item.get('last_checked_epoch')
+    if epoch is not None:
+        return epoch
+    
+    # Entries written before epochs were stored only have the ISO string
+    try:
+        return datetime.fromisoformat(cached_item['last_checked']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
 def is_cache_fresh(cached_item):
     """
     Check if cached data is still fresh (< CACHE_DURATION_HOURS old)
     
     Args:
-        cached_item: Cached data dict with 'last_checked' field
+        cached_item: Cached data dict with 'last_checked_epoch' or
+            'last_checked' field
     
     Returns:
         True if fresh, False if stale
     """
-    try:
-        last_checked = datetime.fromisoformat(cached_item['last_checked'])
-        age = datetime.now() - last_checked
-        return age < timedelta(hours=CACHE_DURATION_HOURS)
-    except (KeyError, ValueError):
+    epoch = cached_epoch(cached_item)
+    if epoch is None:
         return False
+    return time.time() - epoch < CACHE_DURATION_HOURS * 3600
 
 # ============================================================
 # MAIN FUNCTION: Check Availability
 # ============================================================
-def check_medicine_availability(medicine_name, use_cache=True, verbose=True):
+def check_medicine_availability(medicine_name, use_cache=True, verbose=True, medicines=None, index=None):
     """
     Main function to check medicine availability on dawaai.pk
     
@@ -225,6 +367,8 @@ def check_medicine_availability(medicine_name, use_cache=True, verbose=True):
         medicine_name: Name of the medicine (e.g., "Panadol", "Brufen")
         use_cache: Whether to use cached data (default: True)
         verbose: Whether to print status messages (default: True)
+        medicines: Already loaded medicines (default: load medicines.json)
+        index: Optional build_medicine_index(medicines) for faster lookup
     
     Returns:
         1 if available
@@ -238,12 +382,13 @@ def check_medicine_availability(medicine_name, use_cache=True, verbose=True):
     """
     
     # Step 1: Load medicines
-    medicines = load_medicines()
+    if medicines is None:
+        medicines = load_medicines()
     if not medicines:
         return None
     
     # Step 2: Find medicine
-    medicine = find_medicine(medicine_name, medicines)
+    medicine = find_medicine(medicine_name, medicines, index=index)
     if not medicine:
         if verbose:
             print(f"❌ Medicine '{medicine_name}' not found in database")
@@ -254,14 +399,13 @@ def check_medicine_availability(medicine_name, use_cache=True, verbose=True):
     
     # Step 3: Check cache (if enabled)
     if use_cache:
-        cache = load_cache()
-        cache_key = medicine['name']
+        cached_item = cache_get(medicine['name'])
         
-        if cache_key in cache and is_cache_fresh(cache[cache_key]):
+        if cached_item and is_cache_fresh(cached_item):
             if verbose:
-                age_minutes = (datetime.now() - datetime.fromisoformat(cache[cache_key]['last_checked'])).seconds // 60
+                age_minutes = int(time.time() - cached_epoch(cached_item)) // 60
                 print(f"📦 Using cached data ({age_minutes} minutes old)")
-            return cache[cache_key]['available']
+            return cached_item['available']
     
     # Step 4: Extract p_id from URL
     url = medicine.get('url', '')
@@ -295,15 +439,14 @@ def check_medicine_availability(medicine_name, use_cache=True, verbose=True):
     
     # Step 7: Update cache
     if use_cache:
-        cache = load_cache()
-        cache[medicine['name']] = {
+        cache_put(medicine['name'], {
             'available': availability,
             'price': api_response.get('product', {}).get('p_price', ''),
             'out_of_stock': api_response.get('out_of_stock'),
             'p_id': p_id,
-            'last_checked': datetime.now().isoformat()
-        }
-        save_cache(cache)
+            'last_checked': datetime.now().isoformat(),
+            'last_checked_epoch': time.time()
+        })
     
     return availability
 
@@ -328,7 +471,8 @@ def check_multiple_medicines(medicine_names, use_cache=True):
     """
     results = {}
     
-    for medicine_name in medicine_names:
+    # Each distinct name is checked once
+    for medicine_name in dict.fromkeys(medicine_names):
         print(f"\n{'='*60}")
         print(f"Checking: {medicine_name}")
         print(f"{'='*60}")
@@ -338,6 +482,43 @@ def check_multiple_medicines(medicine_names, use_cache=True):
     
     return results
 
+def check_multiple_medicines_parallel(medicine_names, use_cache=True, max_workers=MAX_PARALLEL_CHECKS,
+                                      medicines=None, index=None):
+    """
+    Check availability for multiple medicines concurrently
+    
+    API calls are network-bound, so they run in a thread pool sharing SESSION.
+    
+    Args:
+        medicine_names: List of medicine names
+        use_cache: Whether to use cached data
+        max_workers: Maximum number of concurrent checks
+        medicines: Already loaded medicines (default: load medicines.json once)
+        index: Optional build_medicine_index(medicines) for faster lookup
+    
+    Returns:
+        Dict mapping medicine names to availability (1/0/None), in input order
+    """
+    if medicines is None:
+        medicines = load_medicines()
+    
+    # Check each distinct name once, submitting names that share a prefix
+    # bucket together so their index lookups run back to back
+    unique_names = list(dict.fromkeys(medicine_names))
+    unique_names.sort(key=lambda name: name.lower().strip()[:3])
+    
+    found = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(check_medicine_availability, medicine_name, use_cache=use_cache,
+                            verbose=False, medicines=medicines, index=index): medicine_name
+            for medicine_name in unique_names
+        }
+        for future in as_completed(futures):
+            found[futures[future]] = future.result()
+    
+    return {medicine_name: found[medicine_name] for medicine_name in medicine_names}
+
 # ============================================================
 # USAGE EXAMPLES
 # ============================================================
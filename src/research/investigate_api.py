@@ -9,8 +9,21 @@ This script will:
 """
 
 import asyncio
-from playwright.async_api import async_playwright
-import json
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import sys
+from pathlib import Path
+
+# Captured API traffic is saved by the JSON helper in src/core
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import dump_json
+
+PROFILE_DIR = '.playwright_profile'
+BROWSER_ARGS = [
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled'
+]
 
 async def investigate_dawaai_api():
     """Investigate dawaai.pk for hidden APIs"""
@@ -22,23 +35,38 @@ async def investigate_dawaai_api():
     # Test URL - a known medicine
     test_url = "https://dawaai.pk/medicine/panadol-5-24329.html"
     
-    network_requests = []
+    # Only documents and XHR/fetch calls can be API endpoints
+    interesting_types = ('document', 'xhr', 'fetch')
+    
+    # Details of interesting requests, stored column-wise
+    request_urls = []
+    request_methods = []
+    request_rtypes = []
+    request_types = {}
     api_endpoints = []
     
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
+        # Persistent profile keeps cookies and HTTP/JS caches between runs
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=PROFILE_DIR,
+            headless=True,
+            args=BROWSER_ARGS
+        )
         page = await context.new_page()
         
         # Capture all network requests
         def handle_request(request):
-            network_requests.append({
-                'url': request.url,
-                'method': request.method,
-                'resource_type': request.resource_type
-            })
+            rtype = request.resource_type
+            request_types[rtype] = request_types.get(rtype, 0) + 1
+            if rtype not in interesting_types:
+                return
+            request_urls.append(request.url)
+            request_methods.append(request.method)
+            request_rtypes.append(rtype)
         
         def handle_response(response):
+            if response.request.resource_type not in interesting_types:
+                return
             # Look for JSON responses (potential APIs)
             if 'json' in response.headers.get('content-type', '').lower():
                 api_endpoints.append({
@@ -54,11 +82,17 @@ async def investigate_dawaai_api():
         print("   Monitoring network traffic...\n")
         
         try:
-            await page.goto(test_url, wait_until='networkidle', timeout=30000)
-            await page.wait_for_timeout(3000)  # Wait a bit more for any lazy-loaded content
+            try:
+                # The product API is the last interesting call on the page, so
+                # wait for it instead of network idle plus a fixed delay
+                async with page.expect_response(lambda r: 'get_product' in r.url, timeout=15000):
+                    await page.goto(test_url, wait_until='domcontentloaded', timeout=30000)
+            except PlaywrightTimeoutError:
+                print("   ⚠️  get_product call not seen, continuing with captured traffic")
             
             print(f"✅ Page loaded successfully!")
-            print(f"   Total network requests: {len(network_requests)}")
+            total_requests = sum(request_types.values())
+            print(f"   Total network requests: {total_requests}")
             print(f"   Potential API endpoints: {len(api_endpoints)}")
             
             # Analyze the page structure for availability indicators
@@ -131,26 +165,23 @@ async def investigate_dawaai_api():
             
             # Show interesting requests
             print(f"\n📡 Network Request Types:")
-            request_types = {}
-            for req in network_requests:
-                rtype = req['resource_type']
-                request_types[rtype] = request_types.get(rtype, 0) + 1
-            
             for rtype, count in sorted(request_types.items(), key=lambda x: x[1], reverse=True):
                 print(f"   {rtype}: {count}")
             
             # Save detailed results
             results = {
                 'test_url': test_url,
-                'total_requests': len(network_requests),
+                'total_requests': total_requests,
                 'api_endpoints': api_endpoints,
                 'availability_indicators': found_indicators,
                 'request_types': request_types,
-                'all_requests': network_requests[:50]  # Save first 50 requests
+                'all_requests': [  # Save first 50 interesting requests
+                    {'url': url, 'method': method, 'resource_type': rtype}
+                    for url, method, rtype in zip(request_urls[:50], request_methods[:50], request_rtypes[:50])
+                ]
             }
             
-            with open('api_investigation_results.json', 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            dump_json(results, 'api_investigation_results.json')
             
             print(f"\n💾 Detailed results saved to: api_investigation_results.json")
             
@@ -177,7 +208,7 @@ async def investigate_dawaai_api():
             print(f"❌ Error during investigation: {e}")
         
         finally:
-            await browser.close()
+            await context.close()
 
 if __name__ == "__main__":
     asyncio.run(investigate_dawaai_api())
@@ -3,22 +3,161 @@ Deep Investigation: Testing the hidden API endpoint
 """
 
 import asyncio
-from playwright.async_api import async_playwright
 import json
+import re
+import sys
+from pathlib import Path
+
+import httpx
+
+# The captured API responses are saved by the JSON helper in src/core
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import dump_json
+
+PROFILE_DIR = '.playwright_profile'
+BROWSER_ARGS = [
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled'
+]
+
+TEST_URL = "https://dawaai.pk/medicine/panadol-5-24329.html"
+API_ENDPOINT = "https://dawaai.pk/product/get_product"
+
+# Common keys that might indicate availability
+AVAILABILITY_KEYS = ['available', 'stock', 'in_stock', 'out_of_stock', 
+                     'availability', 'quantity', 'is_available']
+
+def search_dict(d, keys, path=""):
+    """Iteratively search for keys in nested dict (depth-first, like recursion)"""
+    keys = tuple(key.lower() for key in keys)
+    results = []
+    # (value, path, whether its key matched); a match is emitted when its
+    # entry is popped, so it comes before anything nested under it
+    stack = [(d, path, False)]
+    while stack:
+        node, node_path, matched = stack.pop()
+        if matched:
+            results.append((node_path, node))
+        children = []
+        if isinstance(node, dict):
+            for k, v in node.items():
+                current_path = f"{node_path}.{k}" if node_path else k
+                k_lower = k.lower()
+                children.append((v, current_path, any(key in k_lower for key in keys)))
+        elif isinstance(node, list):
+            for i, item in enumerate(node):
+                children.append((item, f"{node_path}[{i}]", False))
+        # LIFO: push in reverse so the first child is searched first
+        stack.extend(reversed(children))
+    return results
+
+def analyze_api_responses(api_responses):
+    """Print availability analysis for captured responses and save them"""
+    if api_responses:
+        print(f"\n{'='*70}")
+        print("📊 API RESPONSE ANALYSIS")
+        print(f"{'='*70}")
+        
+        for i, resp in enumerate(api_responses, 1):
+            print(f"\nResponse #{i}:")
+            print(f"URL: {resp['url']}")
+            print(f"Status: {resp['status']}")
+            print(f"\nResponse Body (first 500 chars):")
+            body_str = json.dumps(resp['body'], indent=2)
+            print(body_str[:500] + "..." if len(body_str) > 500 else body_str)
+            
+            # Check for availability indicators
+            body = resp['body']
+            print(f"\n🔍 Looking for availability indicators...")
+            
+            found_keys = search_dict(body, AVAILABILITY_KEYS)
+            
+            if found_keys:
+                print(f"   ✅ Found {len(found_keys)} potential availability indicators:")
+                for key_path, value in found_keys[:10]:  # Show first 10
+                    print(f"      {key_path}: {value}")
+            else:
+                print(f"   ⚠️  No obvious availability indicators found")
+                print(f"   Showing all top-level keys:")
+                if isinstance(body, dict):
+                    for key in list(body.keys())[:20]:
+                        print(f"      - {key}")
+        
+        # Save full response
+        dump_json(api_responses, 'api_response_analysis.json')
+        
+        print(f"\n💾 Full API response saved to: api_response_analysis.json")
+        
+    else:
+        print(f"\n❌ No API responses captured")
+        print(f"   The API might not be called on every page load")
+    
+    print(f"\n{'='*70}")
+    print("💡 CONCLUSION")
+    print(f"{'='*70}")
+    
+    if api_responses:
+        print("✅ Hidden API successfully captured!")
+        print("   Next steps:")
+        print("   1. Analyze the API response structure")
+        print("   2. Identify the availability field")
+        print("   3. Create a fast API-based checker")
+    else:
+        print("⚠️  API not captured in this test")
+        print("   Will use HTML scraping approach instead")
+    
+    print(f"{'='*70}\n")
+
+async def test_hidden_api_direct():
+    """Probe the known endpoint directly, without launching a browser"""
+    
+    print("="*70)
+    print("🎯 Testing Hidden API directly: /product/get_product")
+    print("="*70)
+    
+    api_responses = []
+    p_id = re.search(r'-(\d+)\.html', TEST_URL).group(1)
+    
+    print(f"\n📡 POST {API_ENDPOINT} (p_id={p_id})...")
+    # verify=False: dawaai.pk certificate is expired (see websearchfunction.py)
+    async with httpx.AsyncClient(http2=True, verify=False, timeout=10.0) as client:
+        try:
+            response = await client.post(
+                API_ENDPOINT,
+                data={'p_id': p_id},
+                headers={'User-Agent': 'Mozilla/5.0', 'Referer': TEST_URL}
+            )
+            api_responses.append({
+                'url': str(response.url),
+                'status': response.status_code,
+                'body': response.json()
+            })
+            print(f"\n✅ Captured API Response!")
+            print(f"   Status: {response.status_code}")
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"   Request failed: {e}")
+    
+    analyze_api_responses(api_responses)
 
 async def test_hidden_api():
-    """Test the hidden API endpoint we discovered"""
+    """Discover the hidden API endpoint by watching a real page load"""
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
     
     print("="*70)
     print("🎯 Testing Hidden API: /product/get_product")
     print("="*70)
     
-    test_url = "https://dawaai.pk/medicine/panadol-5-24329.html"
     api_responses = []
     
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
+        # Persistent profile keeps cookies and HTTP/JS caches between runs
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=PROFILE_DIR,
+            headless=True,
+            args=BROWSER_ARGS
+        )
         page = await context.new_page()
         
         # Capture API responses
@@ -37,88 +176,23 @@ async def test_hidden_api():
                 except Exception as e:
                     print(f"   Could not parse JSON: {e}")
         
-        page.on('response', handle_response)
-        
-        print(f"\n📄 Loading page and monitoring API calls...")
-        await page.goto(test_url, wait_until='networkidle', timeout=30000)
-        await page.wait_for_timeout(2000)
+        print(f"\n📄 Loading page and waiting for the API call...")
+        try:
+            # Wait for the endpoint itself rather than for network idle
+            async with page.expect_response(lambda r: 'get_product' in r.url, timeout=15000) as response_info:
+                await page.goto(TEST_URL, wait_until='domcontentloaded', timeout=30000)
+            await handle_response(await response_info.value)
+        except PlaywrightTimeoutError:
+            print("   ⚠️  get_product call not seen, no API response captured")
         
-        if api_responses:
-            print(f"\n{'='*70}")
-            print("📊 API RESPONSE ANALYSIS")
-            print(f"{'='*70}")
-            
-            for i, resp in enumerate(api_responses, 1):
-                print(f"\nResponse #{i}:")
-                print(f"URL: {resp['url']}")
-                print(f"Status: {resp['status']}")
-                print(f"\nResponse Body (first 500 chars):")
-                body_str = json.dumps(resp['body'], indent=2)
-                print(body_str[:500] + "..." if len(body_str) > 500 else body_str)
-                
-                # Check for availability indicators
-                body = resp['body']
-                print(f"\n🔍 Looking for availability indicators...")
-                
-                # Common keys that might indicate availability
-                availability_keys = ['available', 'stock', 'in_stock', 'out_of_stock', 
-                                    'availability', 'quantity', 'is_available']
-                
-                def search_dict(d, keys, path=""):
-                    """Recursively search for keys in nested dict"""
-                    results = []
-                    if isinstance(d, dict):
-                        for k, v in d.items():
-                            current_path = f"{path}.{k}" if path else k
-                            if any(key.lower() in k.lower() for key in keys):
-                                results.append((current_path, v))
-                            if isinstance(v, (dict, list)):
-                                results.extend(search_dict(v, keys, current_path))
-                    elif isinstance(d, list):
-                        for i, item in enumerate(d):
-                            results.extend(search_dict(item, keys, f"{path}[{i}]"))
-                    return results
-                
-                found_keys = search_dict(body, availability_keys)
-                
-                if found_keys:
-                    print(f"   ✅ Found {len(found_keys)} potential availability indicators:")
-                    for key_path, value in found_keys[:10]:  # Show first 10
-                        print(f"      {key_path}: {value}")
-                else:
-                    print(f"   ⚠️  No obvious availability indicators found")
-                    print(f"   Showing all top-level keys:")
-                    if isinstance(body, dict):
-                        for key in list(body.keys())[:20]:
-                            print(f"      - {key}")
-            
-            # Save full response
-            with open('api_response_analysis.json', 'w', encoding='utf-8') as f:
-                json.dump(api_responses, f, indent=2, ensure_ascii=False)
-            
-            print(f"\n💾 Full API response saved to: api_response_analysis.json")
-            
-        else:
-            print(f"\n❌ No API responses captured")
-            print(f"   The API might not be called on every page load")
-        
-        await browser.close()
-        
-        print(f"\n{'='*70}")
-        print("💡 CONCLUSION")
-        print(f"{'='*70}")
-        
-        if api_responses:
-            print("✅ Hidden API successfully captured!")
-            print("   Next steps:")
-            print("   1. Analyze the API response structure")
-            print("   2. Identify the availability field")
-            print("   3. Create a fast API-based checker")
-        else:
-            print("⚠️  API not captured in this test")
-            print("   Will use HTML scraping approach instead")
-        
-        print(f"{'='*70}\n")
+        await context.close()
+    
+    analyze_api_responses(api_responses)
 
 if __name__ == "__main__":
-    asyncio.run(test_hidden_api())
+    # The endpoint is known, so probe it directly by default; pass --browser
+    # to rediscover it from a full page load
+    if '--browser' in sys.argv:
+        asyncio.run(test_hidden_api())
+    else:
+        asyncio.run(test_hidden_api_direct())
@@ -1,19 +1,42 @@
-import requests
-from bs4 import BeautifulSoup
-import json
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+import re
+import sys
 import time
+from pathlib import Path
+
+# medicines.json is written by the orjson-backed helper in src/core
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import dump_json
 
 BASE_URL = "https://dawaai.pk"
 LISTING_URL = "https://dawaai.pk/all-medicines/a"
 LIMIT = 20
 
-def get_soup(url):
+# Only build the parts of a detail page we extract from (skips <head>, etc.)
+DETAIL_STRAINER = SoupStrainer(['h1', 'a', 'img', 'div'])
+
+# Matches text nodes holding a "Rs. X/unit" price or the "Pack Size:" label
+_TEXT_SCAN = re.compile(r'Rs\.[^/]*/|Pack Size:')
+_PRICE_RE = re.compile(r'Rs\.\s*[\d,]+\.?\d*/\w+')
+_PACK_RE = re.compile(r'Pack Size:\s*[^\n]+')
+
+# Shared HTTP/2 client so requests are multiplexed over kept-alive connections
+_CLIENT = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    timeout=15.0,
+    headers={'User-Agent': 'Mozilla/5.0'},
+    follow_redirects=True
+)
+
+def get_soup(url, strainer=None):
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        response = _CLIENT.get(url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'html.parser', parse_only=strainer)
         
-        # Remove script and style elements to avoid extracting JS code
+        # Remove script and style elements nested inside kept subtrees
         for script in soup(["script", "style"]):
             script.decompose()
             
@@ -23,11 +46,11 @@ def get_soup(url):
         return None
 
 def scrape_medicine_details(url):
-    soup = get_soup(url)
+    soup = get_soup(url, strainer=DETAIL_STRAINER)
     if not soup:
         return None
 
-    data = {}
+    data = {'url': url}
     
     # Name
     name_tag = soup.select_one('h1')
@@ -38,22 +61,30 @@ def scrape_medicine_details(url):
     data['brand'] = brand_tag.get_text(strip=True) if brand_tag else ""
     
     # Categories (Therapeutic Class etc)
-    categories = []
-    for cat in soup.select('a[href*="/medicine-category/"], a[href*="/disease/"]'):
-        cat_text = cat.get_text(strip=True)
-        if cat_text and cat_text not in categories:
-            categories.append(cat_text)
-    data['categories'] = categories
+    # dict.fromkeys dedupes in one pass while keeping page order
+    cat_texts = (cat.get_text(strip=True) for cat in soup.select('a[href*="/medicine-category/"], a[href*="/disease/"]'))
+    data['categories'] = list(dict.fromkeys(text for text in cat_texts if text))
     
     # Composition (Generic)
     generic_tag = soup.select_one('a[href*="/generic/"]')
     data['composition'] = generic_tag.get_text(strip=True) if generic_tag else ""
     
+    # Collect price and pack size text nodes in a single tree walk
+    price_elements = []
+    pack_elements = []
+    for elem in soup.find_all(string=_TEXT_SCAN):
+        if 'Pack Size:' in elem:
+            pack_elements.append(elem)
+        if 'Rs.' in elem and '/' in elem:
+            price_elements.append(elem)
+    
+    # Full page text is only needed by the fallbacks; build it at most once
+    all_text = None
+    
     # Price - look for price in the inventory detail section
     price = "N/A"
     
     # Strategy 1: Look for "Rs. X.XX/unit" pattern (most common)
-    price_elements = soup.find_all(string=lambda text: text and 'Rs.' in text and '/' in text)
     for elem in price_elements:
         elem_text = elem.strip()
         # Check if it contains a unit type after the slash
@@ -69,18 +100,17 @@ def scrape_medicine_details(url):
         if inventory_div:
             # Get all text and look for price pattern
             text = inventory_div.get_text()
-            import re
             # Match "Rs. 123.45/unit"
-            match = re.search(r'Rs\.\s*[\d,]+\.?\d*/\w+', text)
+            match = _PRICE_RE.search(text)
             if match:
                 price = match.group(0)
     
     # Strategy 3: Look near the pack size text
     if price == "N/A":
-        all_text = soup.get_text()
-        import re
+        if all_text is None:
+            all_text = soup.get_text()
         # Find all Rs. X/unit patterns
-        matches = re.findall(r'Rs\.\s*[\d,]+\.?\d*/\w+', all_text)
+        matches = _PRICE_RE.findall(all_text)
         if matches:
             price = matches[0]  # Take the first one found
     
@@ -90,7 +120,6 @@ def scrape_medicine_details(url):
     pack_info = "N/A"
     
     # Strategy 1: Look for "Pack Size:" text
-    pack_elements = soup.find_all(string=lambda text: text and 'Pack Size:' in text if text else False)
     if pack_elements:
         for elem in pack_elements:
             parent_text = elem.parent.get_text(strip=True) if elem.parent else elem.strip()
@@ -100,9 +129,9 @@ def scrape_medicine_details(url):
     
     # Strategy 2: Use regex to find pack size pattern
     if pack_info == "N/A":
-        all_text = soup.get_text()
-        import re
-        match = re.search(r'Pack Size:\s*[^\n]+', all_text)
+        if all_text is None:
+            all_text = soup.get_text()
+        match = _PACK_RE.search(all_text)
         if match:
             pack_info = match.group(0).strip()
     
@@ -127,21 +156,29 @@ def scrape_medicine_details(url):
         'faqs': 'tab-7'
     }
     
+    # Index elements by id once so each tab lookup is a dict get; the first
+    # element wins on a repeated id, as with select_one('#id')
+    id_index = {}
+    for el in soup.find_all(id=True):
+        id_index.setdefault(el['id'], el)
+    
     for key, tab_id in tab_sections.items():
         data[key] = ""
-        tab_div = soup.select_one(f'#{tab_id}')
+        tab_div = id_index.get(tab_id)
         if tab_div:
             # Get all text content, excluding nested tabs
             content_parts = []
+            seen = set()
             for elem in tab_div.find_all(['p', 'ul', 'li', 'h3', 'h4']):
                 text = elem.get_text(strip=True)
-                if text and text not in content_parts:
+                if text and text not in seen:
+                    seen.add(text)
                     content_parts.append(text)
             data[key] = "\n".join(content_parts)
     
     # Expert Advice - usually in tab-1 under h3
     expert_advice = ""
-    intro_tab = soup.select_one('#tab-1')
+    intro_tab = id_index.get('tab-1')
     if intro_tab:
         expert_h3 = intro_tab.find('h3', string=lambda text: 'Expert Advice' in text if text else False)
         if expert_h3:
@@ -158,7 +195,7 @@ def scrape_medicine_details(url):
     
     # Disclaimer - usually at the end of FAQs
     disclaimer = ""
-    faqs_tab = soup.select_one('#tab-7')
+    faqs_tab = id_index.get('tab-7')
     if faqs_tab:
         disclaimer_elem = faqs_tab.find(string=lambda text: 'Disclaimer' in text if text else False)
         if disclaimer_elem:
@@ -178,15 +215,8 @@ def main():
         print("Failed to fetch listing page.")
         return
 
-    # Find medicine links
-    links = []
-    seen_urls = set()
-    
-    for a in soup.select('a[href*="/medicine/"]'):
-        href = a['href']
-        if href not in seen_urls:
-            links.append(href)
-            seen_urls.add(href)
+    # Find medicine links (dict.fromkeys dedupes while keeping page order)
+    links = list(dict.fromkeys(a['href'] for a in soup.select('a[href*="/medicine/"]')))
             
     print(f"Found {len(links)} medicines. Processing first {LIMIT}...")
     
@@ -210,8 +240,7 @@ def main():
     except Exception as e:
         print(f"\nAn error occurred: {e}. Saving progress...")
     finally:
-        with open('medicines.json', 'w', encoding='utf-8') as f:
-            json.dump(medicines, f, indent=2, ensure_ascii=False)
+        dump_json(medicines, 'medicines.json')
         
         print(f"Done. Saved {len(medicines)} medicines to medicines.json")
 
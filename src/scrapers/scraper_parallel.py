@@ -1,86 +1,132 @@
 import asyncio
 from playwright.async_api import async_playwright
-import json
+import re
+import sys
 import time
 import string
+import itertools
+import multiprocessing
 import os
-from datetime import datetime
+import glob
+from pathlib import Path
+
+# Shard journals and medicines.json are (de)serialized by the helpers in src/core
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import loads, load_json, dumps_indented, dumps_line
+
+# Optional token-bucket rate limit for page loads
+try:
+    from aiolimiter import AsyncLimiter
+    HAS_AIOLIMITER = True
+except ImportError:
+    HAS_AIOLIMITER = False
 
 BASE_URL = "https://dawaai.pk"
-MAX_WORKERS = 10  # Number of concurrent browser contexts
+MAX_WORKERS = 10  # Number of concurrent browser contexts per process
+NUM_PROCESSES = min(4, os.cpu_count() or 1)  # Scraper processes, each with its own browser
 SAVE_INTERVAL = 50  # Save progress every N medicines
+ROTATE_EVERY = 200  # Recreate each worker's browser context every N URLs
+MAX_RATE = 20  # Page loads per second across all processes when aiolimiter is installed
+REQUEST_DELAY = 0.5  # Seconds each worker pauses between URLs without aiolimiter (0 to disable)
+BLOCKED_RESOURCE_TYPES = {'image', 'stylesheet', 'font', 'media'}
+BLOCKED_URL_PARTS = ('google-analytics', 'googletagmanager', 'facebook', 'hotjar', 'doubleclick')
+
+# Token bucket shared by all workers in a process. Each spawned process
+# imports its own, so each gets an equal share of MAX_RATE
+RATE_LIMITER = AsyncLimiter(MAX_RATE / NUM_PROCESSES, 1) if HAS_AIOLIMITER and MAX_RATE else None
+
+_PRICE_RE = re.compile(r'Rs\.\s*[\d,]+\.?\d*/\w+')
+_PACK_RE = re.compile(r'Pack Size:\s*[^\n<]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+_EXPERT_RE = re.compile(r'Expert Advice\s*(.+?)(?=\n\n|\Z)', re.DOTALL)
+_DISC_RE = re.compile(r'Disclaimer\s*(.+?)(?=\n\n|\Z)', re.DOTALL)
+
+# Reads every field scrape_medicine_details needs in a single round-trip
+_EXTRACT_JS = """
+() => {
+    const text = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? el.textContent : '';
+    };
+    const categories = new Set();
+    for (const a of document.querySelectorAll('a[href*="/medicine-category/"], a[href*="/disease/"]')) {
+        const catText = a.textContent.trim();
+        if (catText) categories.add(catText);
+    }
+    const img = document.querySelector('.product-slider img, .product-image img, img[src*="product.dawaai.pk"]');
+    const tabs = {};
+    for (let i = 1; i <= 7; i++) {
+        const tab = document.getElementById('tab-' + i);
+        tabs['tab-' + i] = tab ? tab.textContent : '';
+    }
+    return {
+        name: text('h1'),
+        brand: text('a[href*="/brands/"]'),
+        categories: Array.from(categories),
+        composition: text('a[href*="/generic/"]'),
+        image_url: img ? (img.getAttribute('src') || '') : '',
+        tabs: tabs,
+        page_html: document.documentElement.outerHTML
+    };
+}
+"""
+
+def dump_json_item(obj):
+    """Serialize obj as an indented element of a top-level JSON array"""
+    item = dumps_indented(obj)
+    # JSON strings never contain raw newlines, so this only indents structure
+    return b'\n'.join(b'  ' + line for line in item.split(b'\n'))
 
 def clean_text(text):
-    """Clean text by removing excessive whitespace and newlines"""
-    if not text:
-        return ""
-    text = ' '.join(text.split())
-    import re
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    """Clean text by collapsing all whitespace runs (incl. newlines) to single spaces"""
+    return ' '.join(text.split()) if text else ""
 
 async def scrape_medicine_details(page, url):
     """Scrape details from a single medicine page"""
     try:
-        await page.goto(url, wait_until='networkidle', timeout=30000)
-        await page.wait_for_timeout(1000)
+        # Wait for the first element we read instead of network idle
+        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        await page.wait_for_selector('h1', timeout=15000)
+        
+        fields = await page.evaluate(_EXTRACT_JS)
+        page_html = fields['page_html']
+        tabs = fields['tabs']
         
         data = {}
         
+        # URL (used to skip already-scraped pages on resume)
+        data['url'] = url
+        
         # Name
-        name = await page.locator('h1').first.text_content()
-        data['name'] = name.strip() if name else ""
+        data['name'] = fields['name'].strip()
         
         # Brand
-        brand = await page.locator('a[href*="/brands/"]').first.text_content()
-        data['brand'] = brand.strip() if brand else ""
+        data['brand'] = fields['brand'].strip()
         
         # Categories
-        categories = []
-        cat_elements = await page.locator('a[href*="/medicine-category/"], a[href*="/disease/"]').all()
-        for cat in cat_elements:
-            cat_text = await cat.text_content()
-            if cat_text and cat_text.strip() not in categories:
-                categories.append(cat_text.strip())
-        data['categories'] = categories
+        data['categories'] = fields['categories']
         
         # Composition
-        generic = await page.locator('a[href*="/generic/"]').first.text_content()
-        data['composition'] = generic.strip() if generic else ""
+        data['composition'] = fields['composition'].strip()
         
         # Price
         price = "N/A"
-        try:
-            page_text = await page.content()
-            import re
-            matches = re.findall(r'Rs\.\s*[\d,]+\.?\d*/\w+', page_text)
-            if matches:
-                price = matches[0]
-        except:
-            pass
+        matches = _PRICE_RE.findall(page_html)
+        if matches:
+            price = matches[0]
         data['price'] = price
         
         # Pack Info
         pack_info = "N/A"
-        try:
-            page_text = await page.content()
-            import re
-            match = re.search(r'Pack Size:\s*[^\n<]+', page_text)
-            if match:
-                pack_info = match.group(0).strip()
-                pack_info = re.sub(r'<[^>]+>', '', pack_info)
-        except:
-            pass
+        match = _PACK_RE.search(page_html)
+        if match:
+            pack_info = match.group(0).strip()
+            # Clean HTML tags if any
+            pack_info = _TAG_RE.sub('', pack_info)
         data['pack_info'] = pack_info
         
         # Image
-        img_url = ""
-        try:
-            img = await page.locator('.product-slider img, .product-image img, img[src*="product.dawaai.pk"]').first.get_attribute('src')
-            img_url = img if img else ""
-        except:
-            pass
-        data['image_url'] = img_url
+        data['image_url'] = fields['image_url']
         
         # Content sections
         tab_sections = {
@@ -94,44 +140,25 @@ async def scrape_medicine_details(page, url):
         }
         
         for key, tab_id in tab_sections.items():
-            content = ""
-            try:
-                tab_div = page.locator(f'#{tab_id}')
-                if await tab_div.count() > 0:
-                    content = await tab_div.text_content()
-                    content = clean_text(content) if content else ""
-            except:
-                pass
-            data[key] = content
+            content = tabs.get(tab_id)
+            data[key] = clean_text(content) if content else ""
         
         # Expert Advice
         expert_advice = ""
-        try:
-            intro_tab = page.locator('#tab-1')
-            if await intro_tab.count() > 0:
-                intro_text = await intro_tab.text_content()
-                if intro_text and 'Expert Advice' in intro_text:
-                    import re
-                    match = re.search(r'Expert Advice\s*(.+?)(?=\n\n|\Z)', intro_text, re.DOTALL)
-                    if match:
-                        expert_advice = clean_text(match.group(1))
-        except:
-            pass
+        intro_text = tabs.get('tab-1')
+        if intro_text and 'Expert Advice' in intro_text:
+            match = _EXPERT_RE.search(intro_text)
+            if match:
+                expert_advice = clean_text(match.group(1))
         data['expert_advice'] = expert_advice
         
         # Disclaimer
         disclaimer = ""
-        try:
-            faqs_tab = page.locator('#tab-7')
-            if await faqs_tab.count() > 0:
-                faqs_text = await faqs_tab.text_content()
-                if faqs_text and 'Disclaimer' in faqs_text:
-                    import re
-                    match = re.search(r'Disclaimer\s*(.+?)(?=\n\n|\Z)', faqs_text, re.DOTALL)
-                    if match:
-                        disclaimer = clean_text(match.group(1))
-        except:
-            pass
+        faqs_text = tabs.get('tab-7')
+        if faqs_text and 'Disclaimer' in faqs_text:
+            match = _DISC_RE.search(faqs_text)
+            if match:
+                disclaimer = clean_text(match.group(1))
         data['disclaimer'] = disclaimer
         
         return data
@@ -140,42 +167,98 @@ async def scrape_medicine_details(page, url):
         print(f"Error scraping {url}: {e}")
         return None
 
+def shard_medicines_file(shard_id, medicines_file='medicines.json'):
+    """medicines file for one scraper process; its journal sits next to it"""
+    return f"{os.path.splitext(medicines_file)[0]}_shard_{shard_id}.json"
+
 class ProgressTracker:
-    """Thread-safe progress tracking with atomic saves"""
+    """Thread-safe progress tracking with atomic saves
+    
+    New medicines are appended one per line to a .jsonl journal; the
+    indented medicines.json is only rewritten by final_save(). Records are
+    not kept in memory, only their count and URLs (each record carries its
+    'url', which is what resume dedup is based on).
+    """
     def __init__(self, medicines_file='medicines.json', progress_file='progress.json'):
         self.medicines_file = medicines_file
         self.progress_file = progress_file
+        self.jsonl_file = os.path.splitext(medicines_file)[0] + '.jsonl'
+        self.jsonl_fp = open(self.jsonl_file, 'ab')
         self.lock = asyncio.Lock()
-        self.medicines = []
+        self.total_scraped = 0
         self.scraped_urls = set()
         self.save_counter = 0
         self.last_save_time = time.time()
+        self._saving = False  # Only one periodic save runs at a time
         
+    def absorb_shard_journals(self):
+        """Move records from shard journals (finished or interrupted) into ours"""
+        pattern = os.path.splitext(self.medicines_file)[0] + '_shard_*.jsonl'
+        for shard_journal in sorted(glob.glob(pattern)):
+            absorbed = 0
+            for medicine in self._iter_journal(shard_journal):
+                self.jsonl_fp.write(dumps_line(medicine))
+                absorbed += 1
+            self.jsonl_fp.flush()
+            os.fsync(self.jsonl_fp.fileno())
+            os.remove(shard_journal)
+            if absorbed:
+                print(f"Merged {absorbed} medicines from {shard_journal}")
+    
+    def _iter_journal(self, path=None):
+        """Yield medicines from the journal, stopping at a partial last line"""
+        path = path or self.jsonl_file
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield loads(line)
+                except ValueError:
+                    # Partially written last line from an interrupted run
+                    return
+    
     def load_existing_data(self):
-        """Load existing medicines and track scraped URLs"""
+        """Count existing medicines and track scraped URLs"""
         if os.path.exists(self.medicines_file):
             try:
-                with open(self.medicines_file, 'r', encoding='utf-8') as f:
-                    self.medicines = json.load(f)
-                print(f"Loaded {len(self.medicines)} existing medicines")
+                medicines = load_json(self.medicines_file)
+                self.total_scraped = len(medicines)
+                self.scraped_urls = {m['url'] for m in medicines if m.get('url')}
+                print(f"Loaded {len(medicines)} existing medicines")
             except Exception as e:
                 print(f"Error loading medicines: {e}")
-                self.medicines = []
         
-        # Load progress file if exists
+        # Replay medicines appended since the last consolidated save
+        replayed = 0
+        for medicine in self._iter_journal():
+            if medicine.get('url'):
+                self.scraped_urls.add(medicine['url'])
+            replayed += 1
+        self.total_scraped += replayed
+        if replayed:
+            print(f"Replayed {replayed} medicines from {self.jsonl_file}")
+        
+        print(f"Found {len(self.scraped_urls)} scraped URLs in existing medicines")
+        
+        # Older runs tracked URLs only in a separate progress file
         if os.path.exists(self.progress_file):
             try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    progress = json.load(f)
-                    self.scraped_urls = set(progress.get('scraped_urls', []))
-                print(f"Loaded {len(self.scraped_urls)} scraped URLs from progress")
+                progress = load_json(self.progress_file)
+                self.scraped_urls.update(progress.get('scraped_urls', []))
+                print(f"Loaded {len(self.scraped_urls)} scraped URLs including legacy progress")
             except Exception as e:
                 print(f"Error loading progress: {e}")
     
     async def add_medicine(self, url, medicine_data):
         """Add a medicine and save if needed"""
         async with self.lock:
-            self.medicines.append(medicine_data)
+            # The journal's write buffer is the only place the record is kept
+            self.jsonl_fp.write(dumps_line(medicine_data))
+            self.total_scraped += 1
             self.scraped_urls.add(url)
             self.save_counter += 1
             
@@ -186,120 +269,260 @@ class ProgressTracker:
                 (current_time - self.last_save_time) >= 120
             )
             
+            # Snapshot under the lock; the save itself runs without it so
+            # other workers can keep appending
+            should_save = should_save and not self._saving
             if should_save:
-                await self._save()
+                self._saving = True
+                total_scraped = self.total_scraped
                 self.save_counter = 0
                 self.last_save_time = current_time
-    
-    async def _save(self):
-        """Atomic save to prevent corruption"""
-        temp_medicines = self.medicines_file + '.tmp'
-        temp_progress = self.progress_file + '.tmp'
         
+        if should_save:
+            try:
+                await self._save_snapshot(total_scraped)
+            finally:
+                self._saving = False
+    
+    async def _save_snapshot(self, total_scraped):
+        """Flush the journal and make it durable off the event loop"""
+        # Flush buffered journal lines here; only fsync in the worker thread
+        self.jsonl_fp.flush()
+        await asyncio.to_thread(self._save_sync, total_scraped)
+    
+    def _save_sync(self, total_scraped):
+        """Blocking part of a progress save (fsync of the journal)"""
         try:
-            # Save medicines
-            with open(temp_medicines, 'w', encoding='utf-8') as f:
-                json.dump(self.medicines, f, indent=2, ensure_ascii=False)
-            os.replace(temp_medicines, self.medicines_file)
+            # Make appended medicines durable; their URLs are in the records,
+            # so no separate progress file is needed
+            os.fsync(self.jsonl_fp.fileno())
             
-            # Save progress
-            progress_data = {
-                'scraped_urls': list(self.scraped_urls),
-                'total_scraped': len(self.medicines),
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(temp_progress, 'w', encoding='utf-8') as f:
-                json.dump(progress_data, f, indent=2)
-            os.replace(temp_progress, self.progress_file)
-            
-            print(f"  💾 Saved progress ({len(self.medicines)} total)")
+            print(f"  💾 Saved progress ({total_scraped} total)")
         except Exception as e:
             print(f"Error saving: {e}")
     
+    async def close(self):
+        """Make the journal durable and close it without consolidating"""
+        async with self.lock:
+            await self._save_snapshot(self.total_scraped)
+            self.jsonl_fp.close()
+    
     async def final_save(self):
-        """Final save at the end"""
+        """Final save at the end: consolidate the journal into medicines.json"""
         async with self.lock:
-            await self._save()
+            await self._save_snapshot(self.total_scraped)
+            
+            try:
+                written = await asyncio.to_thread(self._write_medicines_sync)
+                
+                # Everything in the journal is now in medicines.json
+                self.jsonl_fp.seek(0)
+                self.jsonl_fp.truncate()
+                print(f"  💾 Saved {written} medicines to {self.medicines_file}")
+            except Exception as e:
+                print(f"Error saving: {e}")
+            finally:
+                self.jsonl_fp.close()
+    
+    def _write_medicines_sync(self):
+        """Atomically rewrite medicines.json as existing records + journal
+        
+        Records are streamed to the temp file one at a time, so only the
+        previous medicines.json is ever held in memory. Records whose URL was
+        already written (e.g. scraped again by another process) are skipped.
+        """
+        existing = []
+        if os.path.exists(self.medicines_file):
+            existing = load_json(self.medicines_file)
+        
+        temp_medicines = self.medicines_file + '.tmp'
+        written = 0
+        seen_urls = set()
+        with open(temp_medicines, 'wb') as f:
+            f.write(b'[')
+            for medicine in itertools.chain(existing, self._iter_journal()):
+                url = medicine.get('url')
+                if url:
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                f.write(b'\n' if written == 0 else b',\n')
+                f.write(dump_json_item(medicine))
+                written += 1
+            f.write(b'\n]' if written else b']')
+        os.replace(temp_medicines, self.medicines_file)
+        return written
 
-async def worker(worker_id, browser, url_queue, tracker, semaphore):
-    """Worker that processes URLs from the queue"""
+async def _block_heavy(route):
+    """Abort requests for resources, trackers and ads the scraper never reads"""
+    request = route.request
+    if (request.resource_type in BLOCKED_RESOURCE_TYPES or
+            any(part in request.url for part in BLOCKED_URL_PARTS)):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def new_worker_page(browser):
+    """Create a fresh context (with heavy resources blocked) and page"""
     context = await browser.new_context()
+    await context.route('**/*', _block_heavy)
     page = await context.new_page()
+    return context, page
+
+async def worker(worker_id, browser, urls, tracker, progress_counter=None):
+    """Worker that processes its own chunk of URLs"""
+    context, page = await new_worker_page(browser)
     
     processed = 0
+    handled = 0
     
     try:
-        while True:
-            try:
-                url = await asyncio.wait_for(url_queue.get(), timeout=1.0)
-            except asyncio.TimeoutError:
-                break
+        for url in urls:
+            # Rotate the context periodically to keep memory bounded on
+            # long runs; the browser itself is shared and kept alive
+            if handled and handled % ROTATE_EVERY == 0:
+                await context.close()
+                context, page = await new_worker_page(browser)
+            handled += 1
             
-            async with semaphore:
-                # Retry logic
-                max_retries = 3
-                details = None
-                
-                for attempt in range(max_retries):
-                    try:
+            # Retry logic
+            max_retries = 3
+            details = None
+            
+            for attempt in range(max_retries):
+                try:
+                    if RATE_LIMITER:
+                        # Only the page load is throttled; no other lock is held
+                        async with RATE_LIMITER:
+                            details = await scrape_medicine_details(page, url)
+                    else:
                         details = await scrape_medicine_details(page, url)
-                        if details:
-                            break
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            await asyncio.sleep(1 * (attempt + 1))
-                        else:
-                            print(f"[Worker {worker_id}] Failed after {max_retries} retries: {url}")
-                
-                if details:
-                    await tracker.add_medicine(url, details)
-                    processed += 1
-                    if processed % 10 == 0:
-                        print(f"[Worker {worker_id}] Processed {processed} medicines")
-                
-                await asyncio.sleep(0.5)  # Small delay
+                    if details:
+                        break
+                except Exception as e:
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(1 * (attempt + 1))
+                    else:
+                        print(f"[Worker {worker_id}] Failed after {max_retries} retries: {url}")
+            
+            if details:
+                await tracker.add_medicine(url, details)
+                processed += 1
+                if progress_counter is not None:
+                    with progress_counter.get_lock():
+                        progress_counter.value += 1
+                if processed % 10 == 0:
+                    total = f" ({progress_counter.value} across all processes)" if progress_counter is not None else ""
+                    print(f"[Worker {worker_id}] Processed {processed} medicines{total}")
             
-            url_queue.task_done()
+            if not RATE_LIMITER and REQUEST_DELAY:
+                await asyncio.sleep(REQUEST_DELAY)
     
     finally:
         await context.close()
         print(f"[Worker {worker_id}] Finished. Processed {processed} medicines")
 
-async def collect_all_urls(page):
-    """Collect all medicine URLs from A-Z"""
-    all_urls = []
+async def collect_all_urls(browser):
+    """Collect all medicine URLs from A-Z, fetching letters concurrently"""
+    semaphore = asyncio.Semaphore(MAX_WORKERS)
     
-    for char in string.ascii_lowercase:
+    async def fetch_letter(char):
         listing_url = f"{BASE_URL}/all-medicines/{char}"
-        print(f"Collecting URLs from {listing_url}...")
-        
-        try:
-            await page.goto(listing_url, wait_until='networkidle', timeout=60000)
-            await page.wait_for_timeout(2000)
-            
-            link_elements = await page.locator('a[href*="/medicine/"]').all()
-            
-            for link_elem in link_elements:
-                href = await link_elem.get_attribute('href')
-                if href and href not in all_urls:
-                    all_urls.append(href)
-            
-            print(f"  Found {len(link_elements)} URLs for '{char}'")
-        except Exception as e:
-            print(f"Error collecting URLs for '{char}': {e}")
+        hrefs = []
+        seen = set()
+        async with semaphore:
+            print(f"Collecting URLs from {listing_url}...")
+            page = await browser.new_page()
+            await page.route('**/*', _block_heavy)
+            try:
+                # Only anchor hrefs are needed, so don't wait for network idle
+                await page.goto(listing_url, wait_until='domcontentloaded', timeout=60000)
+                await page.wait_for_selector('a[href*="/medicine/"]', timeout=15000)
+                
+                link_elements = await page.locator('a[href*="/medicine/"]').all()
+                
+                for link_elem in link_elements:
+                    href = await link_elem.get_attribute('href')
+                    if href and href not in seen:
+                        seen.add(href)
+                        hrefs.append(href)
+                
+                print(f"  Found {len(link_elements)} URLs for '{char}'")
+            except Exception as e:
+                print(f"Error collecting URLs for '{char}': {e}")
+            finally:
+                await page.close()
+        return hrefs
+    
+    letter_urls = await asyncio.gather(*[fetch_letter(char) for char in string.ascii_lowercase])
     
-    # Remove duplicates
-    all_urls = list(dict.fromkeys(all_urls))
+    # Merge in A-Z order, removing duplicates across letters
+    seen = set()
+    all_urls = []
+    for hrefs in letter_urls:
+        for href in hrefs:
+            if href not in seen:
+                seen.add(href)
+                all_urls.append(href)
     print(f"\nTotal unique URLs collected: {len(all_urls)}")
     return all_urls
 
+async def scrape_shard(shard_id, urls, progress_counter):
+    """Scrape one process's share of the URLs with its own browser"""
+    tracker = ProgressTracker(medicines_file=shard_medicines_file(shard_id))
+    # The URL list is known upfront, so split it instead of sharing a queue
+    chunks = [urls[i::MAX_WORKERS] for i in range(MAX_WORKERS)]
+    
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        
+        workers = [
+            asyncio.create_task(worker(f"{shard_id}.{i}", browser, chunk, tracker, progress_counter))
+            for i, chunk in enumerate(chunks) if chunk
+        ]
+        await asyncio.gather(*workers)
+        
+        # The parent merges this shard's journal into medicines.json
+        await tracker.close()
+        await browser.close()
+
+def run_shard(shard_id, urls, progress_counter):
+    """Process entry point (must be top-level to be picklable under spawn)"""
+    asyncio.run(scrape_shard(shard_id, urls, progress_counter))
+
+def run_shards(shards):
+    """
+    Run one scraper process per shard and wait for all of them
+
+    Returns:
+        (medicines scraped, indices of shards whose process exited non-zero)
+    """
+    ctx = multiprocessing.get_context('spawn')
+    # Shared only for progress reporting; records go through shard journals
+    progress_counter = ctx.Value('i', 0)
+    processes = [
+        ctx.Process(target=run_shard, args=(i, shard, progress_counter))
+        for i, shard in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+    failed_shards = []
+    for i, process in enumerate(processes):
+        process.join()
+        if process.exitcode != 0:
+            print(f"❌ Shard {i} process exited with code {process.exitcode}")
+            failed_shards.append(i)
+    return progress_counter.value, failed_shards
+
 async def main():
     tracker = ProgressTracker()
+    # Pick up shard journals left behind by an interrupted run
+    tracker.absorb_shard_journals()
     tracker.load_existing_data()
     
     print(f"\n{'='*60}")
-    print(f"Starting Parallel Scraper with {MAX_WORKERS} workers")
-    print(f"Existing medicines: {len(tracker.medicines)}")
+    print(f"Starting Parallel Scraper with {NUM_PROCESSES} processes x {MAX_WORKERS} workers")
+    print(f"Existing medicines: {tracker.total_scraped}")
     print(f"Already scraped URLs: {len(tracker.scraped_urls)}")
     print(f"{'='*60}\n")
     
@@ -308,51 +531,44 @@ async def main():
         
         # Collect all URLs
         print("Phase 1: Collecting all medicine URLs...")
-        page = await browser.new_page()
-        all_urls = await collect_all_urls(page)
-        await page.close()
-        
-        # Filter out already scraped URLs
-        urls_to_scrape = [url for url in all_urls if url not in tracker.scraped_urls]
-        print(f"\nURLs to scrape: {len(urls_to_scrape)}")
-        print(f"Already scraped: {len(all_urls) - len(urls_to_scrape)}")
-        
-        if not urls_to_scrape:
-            print("\n✅ All URLs already scraped!")
-            await browser.close()
-            return
-        
-        # Create queue and add URLs
-        print(f"\nPhase 2: Scraping with {MAX_WORKERS} parallel workers...")
-        url_queue = asyncio.Queue()
-        for url in urls_to_scrape:
-            await url_queue.put(url)
-        
-        # Semaphore to limit concurrent requests
-        semaphore = asyncio.Semaphore(MAX_WORKERS)
-        
-        # Start workers
-        start_time = time.time()
-        workers = [
-            asyncio.create_task(worker(i, browser, url_queue, tracker, semaphore))
-            for i in range(MAX_WORKERS)
-        ]
-        
-        # Wait for all workers to finish
-        await asyncio.gather(*workers)
-        
-        # Final save
+        all_urls = await collect_all_urls(browser)
+        await browser.close()
+    
+    # Filter out already scraped URLs
+    urls_to_scrape = [url for url in all_urls if url not in tracker.scraped_urls]
+    print(f"\nURLs to scrape: {len(urls_to_scrape)}")
+    print(f"Already scraped: {len(all_urls) - len(urls_to_scrape)}")
+    
+    if not urls_to_scrape:
+        print("\n✅ All URLs already scraped!")
         await tracker.final_save()
-        
-        elapsed = time.time() - start_time
-        print(f"\n{'='*60}")
+        return
+    
+    # Shard round-robin so each process gets a similar mix of letters
+    shards = [urls_to_scrape[i::NUM_PROCESSES] for i in range(NUM_PROCESSES)]
+    shards = [shard for shard in shards if shard]
+    print(f"\nPhase 2: Scraping with {len(shards)} processes x {MAX_WORKERS} workers...")
+    
+    start_time = time.time()
+    scraped, failed_shards = await asyncio.to_thread(run_shards, shards)
+    
+    # Merge shard journals (even from failed shards, so their progress is
+    # kept for the next run), then consolidate (deduped) into medicines.json
+    tracker.absorb_shard_journals()
+    tracker.total_scraped += scraped
+    await tracker.final_save()
+    
+    elapsed = time.time() - start_time
+    print(f"\n{'='*60}")
+    if failed_shards:
+        print(f"⚠️  Scraping Incomplete: {len(failed_shards)} of {len(shards)} shard processes failed "
+              f"(shards {failed_shards}); rerun to resume the remaining URLs")
+    else:
         print(f"✅ Scraping Complete!")
-        print(f"Total medicines: {len(tracker.medicines)}")
-        print(f"Time elapsed: {elapsed/60:.1f} minutes")
-        print(f"Average speed: {len(urls_to_scrape)/(elapsed/60):.1f} medicines/minute")
-        print(f"{'='*60}\n")
-        
-        await browser.close()
+    print(f"Total medicines: {tracker.total_scraped}")
+    print(f"Time elapsed: {elapsed/60:.1f} minutes")
+    print(f"Average speed: {len(urls_to_scrape)/(elapsed/60):.1f} medicines/minute")
+    print(f"{'='*60}\n")
 
 if __name__ == "__main__":
     asyncio.run(main())
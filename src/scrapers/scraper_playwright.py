@@ -1,90 +1,117 @@
 import asyncio
 from playwright.async_api import async_playwright
-import json
+import re
+import sys
 import time
+from pathlib import Path
+
+# Progress and scraped medicines are saved and resumed via src/core's JSON helpers
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import load_json, dump_json
 
 BASE_URL = "https://dawaai.pk"
 LISTING_URL = "https://dawaai.pk/all-medicines/a"
 LIMIT = 20
+BLOCKED_RESOURCE_TYPES = {'image', 'stylesheet', 'font', 'media'}
+BLOCKED_URL_PARTS = ('google-analytics', 'googletagmanager', 'facebook', 'hotjar', 'doubleclick')
+
+_PRICE_RE = re.compile(r'Rs\.\s*[\d,]+\.?\d*/\w+')
+_PACK_RE = re.compile(r'Pack Size:\s*[^\n<]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+_EXPERT_RE = re.compile(r'Expert Advice\s*(.+?)(?=\n\n|\Z)', re.DOTALL)
+_DISC_RE = re.compile(r'Disclaimer\s*(.+?)(?=\n\n|\Z)', re.DOTALL)
+
+# Reads every field scrape_medicine_details needs in a single round-trip
+_EXTRACT_JS = """
+() => {
+    const text = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? el.textContent : '';
+    };
+    const categories = new Set();
+    for (const a of document.querySelectorAll('a[href*="/medicine-category/"], a[href*="/disease/"]')) {
+        const catText = a.textContent.trim();
+        if (catText) categories.add(catText);
+    }
+    const img = document.querySelector('.product-slider img, .product-image img, img[src*="product.dawaai.pk"]');
+    const tabs = {};
+    for (let i = 1; i <= 7; i++) {
+        const tab = document.getElementById('tab-' + i);
+        tabs['tab-' + i] = tab ? tab.textContent : '';
+    }
+    return {
+        name: text('h1'),
+        brand: text('a[href*="/brands/"]'),
+        categories: Array.from(categories),
+        composition: text('a[href*="/generic/"]'),
+        image_url: img ? (img.getAttribute('src') || '') : '',
+        tabs: tabs,
+        page_html: document.documentElement.outerHTML
+    };
+}
+"""
 
 def clean_text(text):
-    """Clean text by removing excessive whitespace and newlines"""
-    if not text:
-        return ""
-    # Replace multiple newlines with a single space
-    text = ' '.join(text.split())
-    # Remove excessive spaces
-    import re
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    """Clean text by collapsing all whitespace runs (incl. newlines) to single spaces"""
+    return ' '.join(text.split()) if text else ""
+
+async def _block_heavy(route):
+    """Abort requests for resources, trackers and ads the scraper never reads"""
+    request = route.request
+    if (request.resource_type in BLOCKED_RESOURCE_TYPES or
+            any(part in request.url for part in BLOCKED_URL_PARTS)):
+        await route.abort()
+    else:
+        await route.continue_()
 
 async def scrape_medicine_details(page, url):
     """Scrape details from a single medicine page"""
     try:
-        await page.goto(url, wait_until='networkidle', timeout=30000)
-        await page.wait_for_timeout(2000)  # Wait for dynamic content
+        # Wait for the first element we read instead of network idle
+        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        await page.wait_for_selector('h1', timeout=15000)
+        
+        fields = await page.evaluate(_EXTRACT_JS)
+        page_html = fields['page_html']
+        tabs = fields['tabs']
         
         data = {}
         
+        # URL (used to skip already-scraped pages on resume)
+        data['url'] = url
+        
         # Name
-        name = await page.locator('h1').first.text_content()
-        data['name'] = name.strip() if name else ""
+        data['name'] = fields['name'].strip()
         
         # Brand
-        brand = await page.locator('a[href*="/brands/"]').first.text_content()
-        data['brand'] = brand.strip() if brand else ""
+        data['brand'] = fields['brand'].strip()
         
         # Categories
-        categories = []
-        cat_elements = await page.locator('a[href*="/medicine-category/"], a[href*="/disease/"]').all()
-        for cat in cat_elements:
-            cat_text = await cat.text_content()
-            if cat_text and cat_text.strip() not in categories:
-                categories.append(cat_text.strip())
-        data['categories'] = categories
+        data['categories'] = fields['categories']
         
         # Composition
-        generic = await page.locator('a[href*="/generic/"]').first.text_content()
-        data['composition'] = generic.strip() if generic else ""
+        data['composition'] = fields['composition'].strip()
         
-        # Price - look for text containing "Rs." and "/"
+        # Price
         price = "N/A"
-        try:
-            # Get all text from the page
-            page_text = await page.content()
-            import re
-            # Find price pattern
-            matches = re.findall(r'Rs\.\s*[\d,]+\.?\d*/\w+', page_text)
-            if matches:
-                price = matches[0]
-        except:
-            pass
+        matches = _PRICE_RE.findall(page_html)
+        if matches:
+            price = matches[0]
         data['price'] = price
         
         # Pack Info
         pack_info = "N/A"
-        try:
-            page_text = await page.content()
-            import re
-            match = re.search(r'Pack Size:\s*[^\n<]+', page_text)
-            if match:
-                pack_info = match.group(0).strip()
-                # Clean HTML tags if any
-                pack_info = re.sub(r'<[^>]+>', '', pack_info)
-        except:
-            pass
+        match = _PACK_RE.search(page_html)
+        if match:
+            pack_info = match.group(0).strip()
+            # Clean HTML tags if any
+            pack_info = _TAG_RE.sub('', pack_info)
         data['pack_info'] = pack_info
         
         # Image
-        img_url = ""
-        try:
-            img = await page.locator('.product-slider img, .product-image img, img[src*="product.dawaai.pk"]').first.get_attribute('src')
-            img_url = img if img else ""
-        except:
-            pass
-        data['image_url'] = img_url
+        data['image_url'] = fields['image_url']
         
-        # Content sections using tab IDs
+        # Content sections
         tab_sections = {
             'introduction': 'tab-1',
             'primary_uses': 'tab-2',
@@ -96,44 +123,25 @@ async def scrape_medicine_details(page, url):
         }
         
         for key, tab_id in tab_sections.items():
-            content = ""
-            try:
-                tab_div = page.locator(f'#{tab_id}')
-                if await tab_div.count() > 0:
-                    content = await tab_div.text_content()
-                    content = clean_text(content) if content else ""
-            except:
-                pass
-            data[key] = content
+            content = tabs.get(tab_id)
+            data[key] = clean_text(content) if content else ""
         
         # Expert Advice
         expert_advice = ""
-        try:
-            intro_tab = page.locator('#tab-1')
-            if await intro_tab.count() > 0:
-                intro_text = await intro_tab.text_content()
-                if intro_text and 'Expert Advice' in intro_text:
-                    import re
-                    match = re.search(r'Expert Advice\s*(.+?)(?=\n\n|\Z)', intro_text, re.DOTALL)
-                    if match:
-                        expert_advice = clean_text(match.group(1))
-        except:
-            pass
+        intro_text = tabs.get('tab-1')
+        if intro_text and 'Expert Advice' in intro_text:
+            match = _EXPERT_RE.search(intro_text)
+            if match:
+                expert_advice = clean_text(match.group(1))
         data['expert_advice'] = expert_advice
         
         # Disclaimer
         disclaimer = ""
-        try:
-            faqs_tab = page.locator('#tab-7')
-            if await faqs_tab.count() > 0:
-                faqs_text = await faqs_tab.text_content()
-                if faqs_text and 'Disclaimer' in faqs_text:
-                    import re
-                    match = re.search(r'Disclaimer\s*(.+?)(?=\n\n|\Z)', faqs_text, re.DOTALL)
-                    if match:
-                        disclaimer = clean_text(match.group(1))
-        except:
-            pass
+        faqs_text = tabs.get('tab-7')
+        if faqs_text and 'Disclaimer' in faqs_text:
+            match = _DISC_RE.search(faqs_text)
+            if match:
+                disclaimer = clean_text(match.group(1))
         data['disclaimer'] = disclaimer
         
         return data
@@ -151,14 +159,9 @@ async def main():
     seen_urls = set()
     if os.path.exists('medicines.json'):
         try:
-            with open('medicines.json', 'r', encoding='utf-8') as f:
-                existing_medicines = json.load(f)
-                for med in existing_medicines:
-                    # We don't have the URL in the json, but we can check by name or just append new ones.
-                    # Ideally we should store the URL in the json to deduplicate.
-                    # For now, let's just append and maybe deduplicate by name later if needed.
-                    # Actually, let's keep a separate progress file or just append to the list.
-                    pass
+            existing_medicines = load_json('medicines.json')
+            # Each record stores the page it came from, so resume by URL
+            seen_urls = {med['url'] for med in existing_medicines if med.get('url')}
         except:
             pass
     
@@ -167,6 +170,7 @@ async def main():
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
+        await page.route('**/*', _block_heavy)
         
         # Iterate through a-z
         for char in string.ascii_lowercase:
@@ -179,23 +183,23 @@ async def main():
                 
                 # Find medicine links
                 links = []
+                seen_links = set()
                 link_elements = await page.locator('a[href*="/medicine/"]').all()
                 
                 for link_elem in link_elements:
                     href = await link_elem.get_attribute('href')
-                    if href:
+                    # Remove duplicates while keeping page order
+                    if href and href not in seen_links:
+                        seen_links.add(href)
                         links.append(href)
                 
-                # Remove duplicates from the list
-                links = list(dict.fromkeys(links))
                 print(f"Found {len(links)} medicines starting with '{char}'.")
                 
                 # Process links
                 for i, link in enumerate(links):
-                    # Check if we already have this medicine (by name maybe? or just scrape everything and filter later)
-                    # Since we don't store URL in json, let's just scrape. 
-                    # To implement resume, we could check if name exists, but names might be duplicate.
-                    # Let's just scrape and append.
+                    # Skip medicines already scraped in a previous run
+                    if link in seen_urls:
+                        continue
                     
                     print(f"[{char.upper()} {i+1}/{len(links)}] Scraping {link}...")
                     
@@ -211,18 +215,17 @@ async def main():
                     
                     if details:
                         existing_medicines.append(details)
+                        seen_urls.add(link)
                         
                         # Save progress every 10 medicines
                         if len(existing_medicines) % 10 == 0:
-                            with open('medicines.json', 'w', encoding='utf-8') as f:
-                                json.dump(existing_medicines, f, indent=2, ensure_ascii=False)
+                            dump_json(existing_medicines, 'medicines.json')
                             print(f"  Saved progress ({len(existing_medicines)} total)")
                     
                     await page.wait_for_timeout(500)  # Small delay
                 
                 # Save after each letter
-                with open('medicines.json', 'w', encoding='utf-8') as f:
-                    json.dump(existing_medicines, f, indent=2, ensure_ascii=False)
+                dump_json(existing_medicines, 'medicines.json')
                 print(f"Completed letter '{char}'. Saved {len(existing_medicines)} total.")
                 
             except Exception as e:
@@ -232,8 +235,7 @@ async def main():
         await browser.close()
         
     # Final save
-    with open('medicines.json', 'w', encoding='utf-8') as f:
-        json.dump(existing_medicines, f, indent=2, ensure_ascii=False)
+    dump_json(existing_medicines, 'medicines.json')
     
     print(f"Done. Saved {len(existing_medicines)} medicines to medicines.json")
 
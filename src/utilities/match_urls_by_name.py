@@ -1,21 +1,44 @@
-import json
+import bisect
+import os
 import re
+import sys
 from datetime import datetime
+from pathlib import Path
+
+# medicines.json, its backup and the URL mapping go through src/core's JSON helpers
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import load_json, dump_json
+
+_WS_RE = re.compile(r'\s+')
+_DOSAGE_RE = re.compile(r'\d+(\.\d+)?\s*(mg|g|ml|mcg|iu|%|x\d+\'s|tablet|capsule|injection|syrup|ointment|cream|drops|suspension).*$', re.IGNORECASE)
 
 def normalize_name(name):
     """Normalize medicine name for better matching"""
     # Convert to lowercase
     name = name.lower().strip()
     # Remove extra spaces
-    name = re.sub(r'\s+', ' ', name)
+    name = _WS_RE.sub(' ', name)
     return name
 
 def get_base_name(full_name):
     """Extract base medicine name (before dosage/pack info)"""
     # Remove dosage patterns like "75mg", "10x10's", "5 g", etc.
-    base = re.sub(r'\d+(\.\d+)?\s*(mg|g|ml|mcg|iu|%|x\d+\'s|tablet|capsule|injection|syrup|ointment|cream|drops|suspension).*$', '', full_name, flags=re.IGNORECASE)
+    base = _DOSAGE_RE.sub('', full_name)
     return base.strip()
 
+def longest_prefix_key(sorted_keys, name):
+    """Return the longest key in sorted_keys that is a prefix of name, or None"""
+    while True:
+        i = bisect.bisect_right(sorted_keys, name) - 1
+        if i < 0:
+            return None
+        key = sorted_keys[i]
+        if name.startswith(key):
+            return key
+        # Any key that is a prefix of name sorts between it and name, so it
+        # must also be a prefix of their common part; search that instead
+        name = os.path.commonprefix([name, key])
+
 def match_medicines_with_urls():
     """Match medicines with URLs using fuzzy matching"""
     
@@ -25,14 +48,12 @@ def match_medicines_with_urls():
     
     # Load medicines
     print("\n📂 Loading medicines.json...")
-    with open('medicines.json', 'r', encoding='utf-8') as f:
-        medicines = json.load(f)
+    medicines = load_json('medicines.json')
     print(f"   Loaded {len(medicines)} medicines")
     
     # Load URL mapping
     print("\n📂 Loading medicine_url_mapping.json...")
-    with open('medicine_url_mapping.json', 'r', encoding='utf-8') as f:
-        url_mapping = json.load(f)
+    url_mapping = load_json('medicine_url_mapping.json')
     print(f"   Loaded {len(url_mapping)} URL mappings")
     
     # Create mapping dictionaries for different matching strategies
@@ -57,6 +78,8 @@ def match_medicines_with_urls():
         if normalized not in starts_map:
             starts_map[normalized] = item['url']
     
+    sorted_starts_keys = sorted(starts_map)
+    
     print(f"\n🔍 Matching strategies prepared:")
     print(f"   Exact matches available: {len(exact_map)}")
     print(f"   Base name matches available: {len(base_map)}")
@@ -89,12 +112,11 @@ def match_medicines_with_urls():
             match_type = "base"
         # Try starts-with match
         else:
-            for key, value in starts_map.items():
-                if normalized_med.startswith(key + " ") or normalized_med.startswith(key):
-                    url = value
-                    matched_starts += 1
-                    match_type = "starts"
-                    break
+            key = longest_prefix_key(sorted_starts_keys, normalized_med)
+            if key is not None:
+                url = starts_map[key]
+                matched_starts += 1
+                match_type = "starts"
         
         if url:
             medicine['url'] = url
@@ -105,13 +127,11 @@ def match_medicines_with_urls():
     # Create backup
     backup_file = f'medicines_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
     print(f"\n💾 Creating backup: {backup_file}")
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        json.dump(medicines, f, indent=2, ensure_ascii=False)
+    dump_json(medicines, backup_file)
     
     # Save updated medicines
     print(f"\n💾 Saving updated medicines.json...")
-    with open('medicines.json', 'w', encoding='utf-8') as f:
-        json.dump(medicines, f, indent=2, ensure_ascii=False)
+    dump_json(medicines, 'medicines.json')
     
     print(f"\n{'='*70}")
     print(f"✅ Matching Complete!")
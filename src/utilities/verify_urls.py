@@ -1,32 +1,67 @@
-import json
+import sys
+from pathlib import Path
 
-# Load medicines and check URL status
-with open('medicines.json', 'r', encoding='utf-8') as f:
-    medicines = json.load(f)
+# ijson streams medicines.json one record at a time; otherwise load it whole
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
 
-with_urls = sum(1 for m in medicines if m.get('url'))
-without_urls = len(medicines) - with_urls
+# Without ijson, medicines.json is parsed whole by the orjson-backed loads in src/core
+sys.path.insert(0, str(Path(__file__).parent.parent / 'core'))
+from json_io import loads
+
+def iter_medicines(path):
+    """Yield medicines from a JSON array file"""
+    with open(path, 'rb') as f:
+        if HAS_IJSON:
+            # Plain floats instead of Decimal; no numeric field is inspected
+            yield from ijson.items(f, 'item', use_float=True)
+            return
+        data = f.read()
+    yield from loads(data)
+
+# Count URL status and keep the samples in a single pass
+total = 0
+with_urls = 0
+with_samples = []  # (position, medicine) for medicines with URLs among the first 10
+without_samples = []  # First 10 medicines without URLs
+medicines = iter_medicines('medicines.json')
+for i, med in enumerate(medicines):
+    total += 1
+    if med.get('url'):
+        with_urls += 1
+        if i < 10:
+            with_samples.append((i, med))
+    elif len(without_samples) < 10:
+        without_samples.append(med)
+    if i >= 9 and len(without_samples) == 10:
+        break
+
+# Both samples are complete; the rest of the file only needs counting
+for med in medicines:
+    total += 1
+    if med.get('url'):
+        with_urls += 1
+without_urls = total - with_urls
 
 print("="*70)
 print("URL Matching Results")
 print("="*70)
-print(f"\nTotal medicines: {len(medicines)}")
-print(f"With URLs: {with_urls} ({with_urls/len(medicines)*100:.1f}%)")
-print(f"Without URLs: {without_urls} ({without_urls/len(medicines)*100:.1f}%)")
+print(f"\nTotal medicines: {total}")
+print(f"With URLs: {with_urls} ({with_urls/total*100:.1f}%)")
+print(f"Without URLs: {without_urls} ({without_urls/total*100:.1f}%)")
 
 print(f"\n{'='*70}")
 print("Sample medicines with URLs:")
 print(f"{'='*70}")
-for i, med in enumerate(medicines[:10]):
-    if med.get('url'):
-        print(f"{i+1}. {med['name'][:45]:45} -> {med['url']}")
+for i, med in with_samples:
+    print(f"{i+1}. {med['name'][:45]:45} -> {med['url']}")
 
 print(f"\n{'='*70}")
 print("Sample medicines without URLs:")
 print(f"{'='*70}")
-count = 0
-for med in medicines:
-    if not med.get('url') and count < 10:
-        print(f"{count+1}. {med['name']}")
-        count += 1
+for count, med in enumerate(without_samples):
+    print(f"{count+1}. {med['name']}")
 print(f"{'='*70}\n")
@@ -0,0 +1,13 @@
+"""
+Shared HTTP session for the test scripts
+Reuses connections (keep-alive) and retries failed connection attempts
+"""
+import requests
+from requests.adapters import HTTPAdapter
+
+TIMEOUT = 60  # Seconds; symptom search waits on the LLM
+
+CLIENT = requests.Session()
+_adapter = HTTPAdapter(max_retries=3, pool_connections=32, pool_maxsize=32)
+CLIENT.mount('http://', _adapter)
+CLIENT.mount('https://', _adapter)
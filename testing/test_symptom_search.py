@@ -4,12 +4,19 @@ Tests the complete pipeline and saves responses for analysis
 """
 import sys
 import os
+import re
 import json
 from datetime import datetime
 
+# JSON inside a ```json ... ``` markdown block
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
 # Add paths
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'core'))
+# src/core under the project root, for the orjson-backed JSON parser
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'core'))
+
+from json_io import loads
 
 print("="*80)
 print("SYMPTOM SEARCH AGENT - MANUAL TEST")
@@ -59,10 +66,11 @@ class TestAgent:
         # Copy the prompt building logic
         context_section = ""
         if rag_context:
-            context_section = "\n\nMEDICAL CONTEXT FROM BOOKS:\n"
+            parts = ["\n\nMEDICAL CONTEXT FROM BOOKS:\n"]
             for i, chunk in enumerate(rag_context[:3], 1):
-                context_section += f"\n[Source {i}] (Relevance: {chunk['score']:.2f})\n"
-                context_section += f"{chunk['text'][:400]}...\n"
+                parts.append(f"\n[Source {i}] (Relevance: {chunk['score']:.2f})\n")
+                parts.append(f"{chunk['text'][:400]}...\n")
+            context_section = ''.join(parts)
         
         prompt = f"""You are a medical AI assistant. Analyze symptoms and recommend medicines in STRICT JSON format.
 
@@ -154,39 +162,45 @@ except Exception as e:
 
 # Step 5: Parse JSON
 print("\n[Step 5] Parsing JSON...")
-import re
 
 try:
     # Clean response
     cleaned = llm_response.strip()
+    json_str = cleaned
     
-    # Remove markdown
-    if '```' in cleaned:
-        code_block_pattern = r'```(?:json)?\s*(.*?)\s*```'
-        matches = re.findall(code_block_pattern, cleaned, re.DOTALL)
-        if matches:
-            cleaned = matches[0]
-            print("  ℹ Extracted from markdown code block")
-    
-    # Find JSON
-    start_idx = cleaned.find('{')
-    end_idx = cleaned.rfind('}')
-    
-    if start_idx == -1:
-        raise ValueError("No opening brace found")
-    if end_idx == -1:
-        print("  ⚠ No closing brace - attempting to fix...")
-        # Add missing braces
-        missing = cleaned[start_idx:].count('{') - cleaned[start_idx:].count('}')
-        if missing > 0:
-            cleaned += '}' * missing
-            end_idx = len(cleaned) - 1
-            print(f"  ℹ Added {missing} closing braces")
-    
-    json_str = cleaned[start_idx:end_idx + 1]
+    # Fast path: the response is already a bare JSON object
+    try:
+        parsed_json = loads(cleaned)
+    except ValueError:  # JSONDecodeError for both parsers
+        parsed_json = None
     
-    # Parse
-    parsed_json = json.loads(json_str)
+    if not isinstance(parsed_json, dict):
+        # Remove markdown
+        if '```' in cleaned:
+            matches = _CODE_BLOCK_RE.findall(cleaned)
+            if matches:
+                cleaned = matches[0]
+                print("  ℹ Extracted from markdown code block")
+        
+        # Find JSON
+        start_idx = cleaned.find('{')
+        end_idx = cleaned.rfind('}')
+        
+        if start_idx == -1:
+            raise ValueError("No opening brace found")
+        if end_idx == -1:
+            print("  ⚠ No closing brace - attempting to fix...")
+            # Add missing braces
+            missing = cleaned[start_idx:].count('{') - cleaned[start_idx:].count('}')
+            if missing > 0:
+                cleaned += '}' * missing
+                end_idx = len(cleaned) - 1
+                print(f"  ℹ Added {missing} closing braces")
+        
+        json_str = cleaned[start_idx:end_idx + 1]
+        
+        # Parse
+        parsed_json = json.loads(json_str)
     
     print(f"✓ JSON parsed successfully!")
     print(f"\n  is_medical_query: {parsed_json.get('is_medical_query')}")
@@ -220,25 +234,29 @@ except Exception as e:
 if parsed_json:
     print("\n[Step 6] Matching with Medicine Database...")
     try:
-        from utils import load_medicines
+        import heapq
+        from utils import load_medicines, parse_price
         medicines = load_medicines()
         print(f"✓ Loaded {len(medicines)} medicines from database")
         
+        def price_key(med):
+            """Numeric price ("Rs. 6.75/tablet" -> 6.75); unpriced medicines last"""
+            price = parse_price(med.get('price', ''))
+            return price if price is not None else 999999
+        
+        # Lowercase once; every recommendation scans the same strings
+        searchable = [(med.get('formula', '').lower(), med.get('name', '').lower(), med) for med in medicines]
+        
         matches_summary = []
         for rec in parsed_json.get('recommendations', []):
             formula = rec.get('chemical_formula', '').lower()
             
             # Search
-            matched = []
-            for med in medicines:
-                med_formula = med.get('formula', '').lower()
-                med_name = med.get('name', '').lower()
-                
-                if formula in med_formula or formula in med_name:
-                    matched.append(med)
+            matched = [med for med_formula, med_name, med in searchable
+                       if formula in med_formula or formula in med_name]
             
-            # Sort by price
-            matched.sort(key=lambda x: float(x.get('price', 999999)) if x.get('price') else 999999)
+            # Cheapest 3 by price (only these are reported)
+            top_3 = heapq.nsmallest(3, matched, key=price_key)
             
             matches_summary.append({
                 'chemical_formula': rec.get('chemical_formula'),
@@ -249,12 +267,12 @@ if parsed_json:
                         'price': m.get('price'),
                         'manufacturer': m.get('manufacturer')
                     }
-                    for m in matched[:3]
+                    for m in top_3
                 ]
             })
             
             print(f"\n  {rec.get('chemical_formula')}: {len(matched)} matches")
-            for m in matched[:3]:
+            for m in top_3:
                 print(f"    - {m.get('name')} | Rs.{m.get('price')} | {m.get('manufacturer')}")
         
         # Save matches
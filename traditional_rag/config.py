@@ -7,11 +7,21 @@ INPUT_FILE = os.path.join(BASE_DIR, "data", "combined_chunks.jsonl")
 
 # Output files
 INDEX_FILE = os.path.join(DATA_DIR, "medical_book.index")
-METADATA_FILE = os.path.join(DATA_DIR, "medical_book_meta.pkl")
+# Chunk store, one record per FAISS row: concatenated UTF-8 records plus
+# uint64 offsets (N+1) into them, memory-mapped by the retriever
+TEXTS_FILE = os.path.join(DATA_DIR, "medical_book_texts.bin")
+TEXTS_OFFSETS_FILE = os.path.join(DATA_DIR, "medical_book_texts_offsets.npy")
+METADATA_FILE = os.path.join(DATA_DIR, "medical_book_meta.bin")  # JSON {"id", "metadata"} records
+METADATA_OFFSETS_FILE = os.path.join(DATA_DIR, "medical_book_meta_offsets.npy")
 
 # Ensure data directory exists
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Embedding Config
 EMBEDDING_DIM = 768  # Nomic embedding dimension
-BATCH_SIZE = 32
+BATCH_SIZE = 128  # Texts per embed_batch request
+
+# HNSW graph index (approximate search, sub-linear in corpus size)
+HNSW_M = 32  # Neighbours per node
+HNSW_EF_CONSTRUCTION = 200  # Build-time search depth (higher = better graph, slower build)
+HNSW_EF_SEARCH = 64  # Query-time search depth (higher = better recall, slower query)
@@ -1,5 +1,4 @@
 import json
-import pickle
 import os
 import numpy as np
 import faiss
@@ -11,21 +10,36 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm_client import get_embedding_client
-from traditional_rag.config import INPUT_FILE, INDEX_FILE, METADATA_FILE, EMBEDDING_DIM, BATCH_SIZE
+from src.core.json_io import loads
+from traditional_rag.config import (INPUT_FILE, INDEX_FILE, TEXTS_FILE, TEXTS_OFFSETS_FILE,
+                                    METADATA_FILE, METADATA_OFFSETS_FILE, EMBEDDING_DIM, BATCH_SIZE,
+                                    HNSW_M, HNSW_EF_CONSTRUCTION)
 
 def load_chunks(file_path: str) -> List[Dict]:
     """Load chunks from JSONL file."""
     chunks = []
+    skipped = 0
     print(f"Loading chunks from {file_path}...")
-    with open(file_path, 'r', encoding='utf-8') as f:
+    # Lines stay bytes: both parsers accept them, so nothing is decoded twice
+    with open(file_path, 'rb') as f:
         for line in f:
             try:
-                chunks.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+                chunks.append(loads(line))
+            except ValueError:  # JSONDecodeError for both parsers
+                skipped += 1
     print(f"Loaded {len(chunks)} chunks.")
+    if skipped:
+        print(f"Skipped {skipped} malformed or blank lines.")
     return chunks
 
+def write_records(records: List[bytes], data_file: str, offsets_file: str):
+    """Write records back to back, with their uint64 start offsets plus the total length."""
+    offsets = np.zeros(len(records) + 1, dtype=np.uint64)
+    np.cumsum([len(record) for record in records], out=offsets[1:])
+    with open(data_file, 'wb') as f:
+        f.writelines(records)
+    np.save(offsets_file, offsets)
+
 def build_index():
     """Build FAISS index from chunks."""
     
@@ -44,78 +58,56 @@ def build_index():
     
     # 3. Generate Embeddings
     print("Generating embeddings...")
-    embeddings = []
-    metadata_map = {} # ID -> Chunk Data
+    texts = [chunk.get('text', '') for chunk in chunks]
     
-    # Process in batches
-    batch_texts = []
-    batch_ids = []
+    # Embeddings are written straight into one contiguous float32 buffer
+    embeddings_np = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    embedded = np.ones(len(texts), dtype=bool)
     
-    for i, chunk in tqdm(enumerate(chunks), total=len(chunks)):
-        text = chunk.get('text', '')
-        chunk_id = chunk.get('id', str(i))
-        
-        # Store metadata
-        metadata_map[i] = chunk # Store by integer index for FAISS mapping
-        
-        batch_texts.append(text)
-        batch_ids.append(i)
-        
-        if len(batch_texts) >= BATCH_SIZE:
-            try:
-                batch_embeddings = embed_client.embed_batch(batch_texts)
-                embeddings.extend(batch_embeddings)
-            except Exception as e:
-                print(f"Error embedding batch: {e}")
-                # Handle error (maybe skip or retry)
-            
-            batch_texts = []
-            batch_ids = []
-            
-    # Process remaining
-    if batch_texts:
+    for start in tqdm(range(0, len(texts), BATCH_SIZE)):
+        end = start + BATCH_SIZE
         try:
-            batch_embeddings = embed_client.embed_batch(batch_texts)
-            embeddings.extend(batch_embeddings)
+            embeddings_np[start:end] = np.asarray(embed_client.embed_batch(texts[start:end]), dtype=np.float32)
         except Exception as e:
-            print(f"Error embedding final batch: {e}")
+            print(f"Error embedding batch {start}-{end}: {e}")
+            embedded[start:end] = False
+    
+    # Drop failed batches so FAISS row ids still line up with the metadata
+    if not embedded.all():
+        embeddings_np = embeddings_np[embedded]
+    indexed_chunks = [chunks[i] for i in np.flatnonzero(embedded)] # FAISS row -> Chunk Data
 
     # 4. Build FAISS Index
     print("Building FAISS index...")
-    embeddings_np = np.array(embeddings).astype('float32')
     
     # Normalize for cosine similarity (if model requires it, usually good practice)
     faiss.normalize_L2(embeddings_np)
     
     # Create Index
-    # IndexFlatIP = Inner Product (Cosine similarity if normalized)
-    index = faiss.IndexFlatIP(EMBEDDING_DIM) 
+    # HNSW graph over inner product (cosine similarity since vectors are normalized);
+    # queries visit a few hundred vectors instead of scanning all of them.
+    # Vectors are stored as float16, halving index size and memory traffic per query
+    index = faiss.IndexHNSWSQ(EMBEDDING_DIM, faiss.ScalarQuantizer.QT_fp16, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
     
-    # GPU Support with Fallback
-    try:
-        print("Attempting to use GPU for indexing...")
-        res = faiss.StandardGpuResources()
-        # Move index to GPU
-        # use float16 for memory efficiency if needed, but standard is fine
-        gpu_index = faiss.index_cpu_to_gpu(res, 0, index)
-        gpu_index.add(embeddings_np)
-        
-        # Move back to CPU for saving
-        index = faiss.index_gpu_to_cpu(gpu_index)
-        print(f"✅ Indexed {index.ntotal} vectors using GPU.")
-        
-    except (AttributeError, Exception) as e:
-        print(f"⚠️  GPU indexing failed or not available ({e}). Falling back to CPU.")
-        index.add(embeddings_np)
-        print(f"✅ Indexed {index.ntotal} vectors using CPU.")
+    # Built on CPU: GPU faiss cannot host an HNSW index, and the fp16
+    # quantizer has no ranges to learn, so there is no training to offload
+    index.train(embeddings_np)
+    index.add(embeddings_np)
+    print(f"✅ Indexed {index.ntotal} vectors using CPU.")
 
     # 5. Save to Disk
     print(f"Saving index to {INDEX_FILE}...")
     faiss.write_index(index, INDEX_FILE)
     
+    print(f"Saving chunk texts to {TEXTS_FILE}...")
+    write_records([(chunk.get('text') or '').encode('utf-8') for chunk in indexed_chunks],
+                  TEXTS_FILE, TEXTS_OFFSETS_FILE)
+    
     print(f"Saving metadata to {METADATA_FILE}...")
-    with open(METADATA_FILE, 'wb') as f:
-        pickle.dump(metadata_map, f)
+    write_records([json.dumps({"id": chunk.get("id"), "metadata": chunk.get("metadata")}).encode('utf-8')
+                   for chunk in indexed_chunks],
+                  METADATA_FILE, METADATA_OFFSETS_FILE)
         
     print("Done!")
 
@@ -1,5 +1,5 @@
 import faiss
-import pickle
+import json
 import numpy as np
 import os
 import sys
@@ -9,34 +9,58 @@ from typing import List, Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm_client import get_embedding_client
-from traditional_rag.config import INDEX_FILE, METADATA_FILE
+from traditional_rag.config import (INDEX_FILE, TEXTS_FILE, TEXTS_OFFSETS_FILE,
+                                    METADATA_FILE, METADATA_OFFSETS_FILE, HNSW_EF_SEARCH)
+
+def _open_records(data_file: str, offsets_file: str):
+    """Memory-map a record file written by indexer.write_records; pages load on first access."""
+    offsets = np.load(offsets_file, mmap_mode='r')
+    if os.path.getsize(data_file) == 0:
+        return np.empty(0, dtype=np.uint8), offsets  # np.memmap cannot map an empty file
+    return np.memmap(data_file, dtype=np.uint8, mode='r'), offsets
+
+def _read_record(records, idx: int) -> bytes:
+    """Bytes of record `idx` from an _open_records pair."""
+    data, offsets = records
+    return data[offsets[idx]:offsets[idx + 1]].tobytes()
 
 class TraditionalRetriever:
     def __init__(self):
         self.index = None
+        self.texts = None
         self.metadata = None
         self.embed_client = get_embedding_client()
         self._load_data()
 
     def _load_data(self):
         """Load index and metadata from disk."""
-        if not os.path.exists(INDEX_FILE) or not os.path.exists(METADATA_FILE):
+        store_files = (INDEX_FILE, TEXTS_FILE, TEXTS_OFFSETS_FILE, METADATA_FILE, METADATA_OFFSETS_FILE)
+        if not all(os.path.exists(path) for path in store_files):
             raise FileNotFoundError(f"Index or metadata file not found. Please run indexer.py first.")
             
-        print(f"Loading FAISS index from {INDEX_FILE}...")
+        index_mb = os.path.getsize(INDEX_FILE) / (1024 * 1024)
+        print(f"Loading FAISS index from {INDEX_FILE} ({index_mb:.1f} MB)...")
         self.index = faiss.read_index(INDEX_FILE)
+        if hasattr(self.index, 'hnsw'):
+            self.index.hnsw.efSearch = HNSW_EF_SEARCH
         
-        print(f"Loading metadata from {METADATA_FILE}...")
-        with open(METADATA_FILE, 'rb') as f:
-            self.metadata = pickle.load(f)
+        print(f"Mapping chunk texts and metadata from {TEXTS_FILE}...")
+        self.texts = _open_records(TEXTS_FILE, TEXTS_OFFSETS_FILE)
+        self.metadata = _open_records(METADATA_FILE, METADATA_OFFSETS_FILE)
             
-        # Move to GPU if available
-        try:
-            self.res = faiss.StandardGpuResources()
-            self.index = faiss.index_cpu_to_gpu(self.res, 0, self.index)
-            print("✅ Moved FAISS index to GPU for faster retrieval.")
-        except (AttributeError, Exception):
+        # Move to GPU if available (CPU-only faiss builds have no get_num_gpus;
+        # GPU faiss has no HNSW, so graph indexes always search on CPU)
+        if not hasattr(faiss, 'get_num_gpus') or faiss.get_num_gpus() == 0:
             print("⚠️  Using CPU for FAISS retrieval (GPU not available).")
+        elif hasattr(self.index, 'hnsw'):
+            print("⚠️  Using CPU for FAISS retrieval (HNSW index is CPU-only).")
+        else:
+            try:
+                self.res = faiss.StandardGpuResources()
+                self.index = faiss.index_cpu_to_gpu(self.res, 0, self.index)
+                print("✅ Moved FAISS index to GPU for faster retrieval.")
+            except RuntimeError as e:
+                print(f"⚠️  Using CPU for FAISS retrieval (GPU transfer failed: {e}).")
             
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -48,29 +72,45 @@ class TraditionalRetriever:
             - metadata: dict
             - score: float
         """
-        # 1. Embed Query
-        query_embedding = self.embed_client.embed(query)
-        query_embedding_np = np.array([query_embedding]).astype('float32')
+        return self.retrieve_batch([query], top_k)[0]
+    
+    def retrieve_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant chunks for several queries with one embedding
+        request and one index search.
+        
+        Returns:
+            One result list per query, in order (same dicts as retrieve)
+        """
+        # 1. Embed Queries
+        # embed_batch returns a fresh float32 array, so asarray wraps it without
+        # a copy and normalization below happens in place (no scratch buffer needed)
+        query_embeddings_np = np.asarray(self.embed_client.embed_batch(queries), dtype=np.float32)
         
-        # Normalize query (same as index)
-        faiss.normalize_L2(query_embedding_np)
+        # Normalize queries (same as index)
+        faiss.normalize_L2(query_embeddings_np)
         
         # 2. Search Index
-        scores, indices = self.index.search(query_embedding_np, top_k)
+        scores, indices = self.index.search(query_embeddings_np, top_k)
         
         # 3. Fetch Metadata
+        return [self._fetch_chunks(row_scores, row_indices)
+                for row_scores, row_indices in zip(scores, indices)]
+    
+    def _fetch_chunks(self, scores, indices) -> List[Dict[str, Any]]:
+        """Result dicts for one query's search hits."""
         results = []
-        for score, idx in zip(scores[0], indices[0]):
+        for score, idx in zip(scores, indices):
             if idx == -1: continue # No result found
+            if idx >= len(self.texts[1]) - 1: continue # Index and chunk store out of sync
             
-            chunk_data = self.metadata.get(idx)
-            if chunk_data:
-                results.append({
-                    "text": chunk_data.get("text"),
-                    "metadata": chunk_data.get("metadata"),
-                    "id": chunk_data.get("id"),
-                    "score": float(score)
-                })
+            chunk_data = json.loads(_read_record(self.metadata, idx))
+            results.append({
+                "text": _read_record(self.texts, idx).decode('utf-8'),
+                "metadata": chunk_data.get("metadata"),
+                "id": chunk_data.get("id"),
+                "score": float(score)
+            })
                 
         return results
 